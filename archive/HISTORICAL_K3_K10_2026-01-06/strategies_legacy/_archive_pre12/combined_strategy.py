@@ -1,3 +1,14 @@
+import numpy as np
+
+
+def combined_mask(filters):
+    """
+    UND-Verknuepfung der vorberechneten Filter-Masken in einem Vektor-Pass.
+    Den selektivsten Filter zuerst uebergeben.
+    """
+    return np.logical_and.reduce([flt.mask() for flt in filters])
+
+
 class CombinedStrategy:
     def __init__(self, filters):
         self.filters = filters
@@ -1,20 +1,40 @@
+import numpy as np
 import pandas as pd
 
 class BollingerFilter:
     def __init__(self, df, window=20, num_std=2):
-        self.df = df.copy()
+        self._close = df['close'].to_numpy(dtype=np.float64, copy=False)
+        self._index = df.index
+        self._src = df  # Basis fuer das lazy gebaute self.df
+        self._df = None
         self.window = window
         self.num_std = num_std
         self._calculate_bands()
+        self._mask = (self._close > self.lower_band) & (self._close < self.upper_band)
 
     def _calculate_bands(self):
-        self.df['ma'] = self.df['close'].rolling(window=self.window).mean()
-        self.df['std'] = self.df['close'].rolling(window=self.window).std()
-        self.df['upper_band'] = self.df['ma'] + (self.df['std'] * self.num_std)
-        self.df['lower_band'] = self.df['ma'] - (self.df['std'] * self.num_std)
+        roll = pd.Series(self._close, index=self._index).rolling(window=self.window)
+        self.ma = roll.mean().to_numpy()
+        self.std = roll.std().to_numpy()
+        self.upper_band = self.ma + (self.std * self.num_std)
+        self.lower_band = self.ma - (self.std * self.num_std)
+
+    @property
+    def df(self):
+        # Kopie des Eingabe-DataFrames mit den Band-Spalten wie frueher, erst beim ersten Zugriff gebaut
+        if self._df is None:
+            df = self._src.copy()
+            df['ma'] = self.ma
+            df['std'] = self.std
+            df['upper_band'] = self.upper_band
+            df['lower_band'] = self.lower_band
+            self._df = df
+        return self._df
+
+    def mask(self):
+        return self._mask
 
     def get_signal(self):
-        signal = (self.df['close'] > self.df['lower_band']) & (self.df['close'] < self.df['upper_band'])
-        return signal.fillna(False)
+        return pd.Series(self._mask, index=self._index)
 
 
@@ -1,12 +1,27 @@
+import numpy as np
 import pandas as pd
 
 class MA200Filter:
     def __init__(self, df):
-        self.df = df.copy()
-        self.ma200 = self.df['close'].rolling(window=200).mean()
+        # nur close wird gelesen: kein Kopieren des ganzen DataFrames
+        self._close = df['close'].to_numpy(dtype=np.float64, copy=False)
+        self._index = df.index
+        self._src = df  # Basis fuer das lazy gebaute self.df
+        self._df = None
+        self.ma200 = pd.Series(self._close, index=self._index).rolling(window=200).mean()
+        self._mask = self._close > self.ma200.to_numpy()
+
+    @property
+    def df(self):
+        # Kopie des Eingabe-DataFrames wie frueher, erst beim ersten Zugriff gebaut
+        if self._df is None:
+            self._df = self._src.copy()
+        return self._df
+
+    def mask(self):
+        return self._mask
 
     def get_signal(self):
-        signal = self.df['close'] > self.ma200
-        return signal.fillna(False)
+        return pd.Series(self._mask, index=self._index)
 
 
@@ -1,21 +1,111 @@
+import numpy as np
 import pandas as pd
 
+try:
+    from numba import njit
+except ImportError:  # numba optional: kernel laeuft dann als reines Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+
+@njit(cache=True)
+def _ewm_step(weighted, old_wt, cur, alpha):
+    # Ein Schritt von pandas ewm(adjust=False, ignore_na=False).mean()
+    if weighted == weighted:
+        old_wt *= 1.0 - alpha
+        if cur == cur:
+            if weighted != cur:
+                weighted = old_wt * weighted + alpha * cur
+                weighted /= old_wt + alpha
+            old_wt = 1.0
+    elif cur == cur:
+        weighted = cur
+    return weighted, old_wt
+
+
+def ema_alpha(span):
+    # Glaettungsfaktor wie pandas ewm(span=...)
+    return 2.0 / (span + 1.0)
+
+
+@njit(cache=True)
+def compute_macd(close, a_fast, a_slow, a_sig):
+    """
+    MACD in einem Durchlauf ueber close; a_* = vorab berechnete EMA-Alphas (ema_alpha).
+    Liefert (macd_line, signal_line, cross); cross[i] = Aufwaerts-Kreuzung
+    der MACD-Linie ueber die Signallinie an Bar i.
+    """
+    n = close.shape[0]
+    macd_line = np.empty(n, np.float64)
+    signal_line = np.empty(n, np.float64)
+    cross = np.zeros(n, np.bool_)
+    if n == 0:
+        return macd_line, signal_line, cross
+
+    ema_f = close[0]
+    ema_s = close[0]
+    w_f = 1.0
+    w_s = 1.0
+    macd = ema_f - ema_s
+    ema_sig = macd
+    w_sig = 1.0
+    macd_line[0] = macd
+    signal_line[0] = ema_sig
+
+    for i in range(1, n):
+        c = close[i]
+        ema_f, w_f = _ewm_step(ema_f, w_f, c, a_fast)
+        ema_s, w_s = _ewm_step(ema_s, w_s, c, a_slow)
+        prev_macd = macd
+        prev_sig = ema_sig
+        macd = ema_f - ema_s
+        ema_sig, w_sig = _ewm_step(ema_sig, w_sig, macd, a_sig)
+        macd_line[i] = macd
+        signal_line[i] = ema_sig
+        cross[i] = (prev_macd < prev_sig) and (macd > ema_sig)
+
+    return macd_line, signal_line, cross
+
+
 class MACDFilter:
     def __init__(self, df, short_window=12, long_window=26, signal_window=9):
-        self.df = df.copy()
+        self._close = df['close'].to_numpy(dtype=np.float64, copy=False)
+        self._index = df.index
+        self._src = df  # Basis fuer das lazy gebaute self.df
+        self._df = None
         self.short_window = short_window
         self.long_window = long_window
         self.signal_window = signal_window
+        self.alpha_fast = ema_alpha(short_window)
+        self.alpha_slow = ema_alpha(long_window)
+        self.alpha_sig = ema_alpha(signal_window)
         self._calculate_macd()
 
     def _calculate_macd(self):
-        self.df['ema_short'] = self.df['close'].ewm(span=self.short_window, adjust=False).mean()
-        self.df['ema_long'] = self.df['close'].ewm(span=self.long_window, adjust=False).mean()
-        self.df['macd'] = self.df['ema_short'] - self.df['ema_long']
-        self.df['signal_line'] = self.df['macd'].ewm(span=self.signal_window, adjust=False).mean()
+        self.macd, self.signal_line, self.cross = compute_macd(
+            self._close, self.alpha_fast, self.alpha_slow, self.alpha_sig
+        )
+        self._mask = self.macd > self.signal_line
+
+    @property
+    def df(self):
+        # Kopie des Eingabe-DataFrames mit den MACD-Spalten wie frueher, erst beim ersten Zugriff gebaut
+        if self._df is None:
+            df = self._src.copy()
+            df['ema_short'] = df['close'].ewm(span=self.short_window, adjust=False).mean()
+            df['ema_long'] = df['close'].ewm(span=self.long_window, adjust=False).mean()
+            df['macd'] = self.macd
+            df['signal_line'] = self.signal_line
+            df['macd_cross'] = self.cross  # Aufwaerts-Kreuzung aus compute_macd
+            self._df = df
+        return self._df
+
+    def mask(self):
+        return self._mask
 
     def get_signal(self):
-        signal = self.df['macd'] > self.df['signal_line']
-        return signal.fillna(False)
+        return pd.Series(self._mask, index=self._index)
 
 
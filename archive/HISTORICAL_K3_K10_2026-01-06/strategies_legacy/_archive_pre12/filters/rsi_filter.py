@@ -1,22 +1,36 @@
+import numpy as np
 import pandas as pd
 
 class RSIFilter:
     def __init__(self, df, period=14, lower=30, upper=70):
-        self.df = df.copy()
+        self._close = df['close'].to_numpy(dtype=np.float64, copy=False)
+        self._index = df.index
+        self._src = df  # Basis fuer das lazy gebaute self.df
+        self._df = None
         self.period = period
         self.lower = lower
         self.upper = upper
         self.rsi = self.compute_rsi()
+        self._mask = ((self.rsi > self.lower) & (self.rsi < self.upper)).to_numpy(dtype=bool)
 
     def compute_rsi(self):
-        delta = self.df['close'].diff()
+        delta = pd.Series(self._close, index=self._index).diff()
         gain = delta.where(delta > 0, 0).rolling(window=self.period).mean()
         loss = -delta.where(delta < 0, 0).rolling(window=self.period).mean()
         rs = gain / loss
         return 100 - (100 / (1 + rs))
 
+    @property
+    def df(self):
+        # Kopie des Eingabe-DataFrames wie frueher, erst beim ersten Zugriff gebaut
+        if self._df is None:
+            self._df = self._src.copy()
+        return self._df
+
+    def mask(self):
+        return self._mask
+
     def get_signal(self):
-        signal = (self.rsi > self.lower) & (self.rsi < self.upper)
-        return signal.fillna(False)
+        return pd.Series(self._mask, index=self._index)
 
 
@@ -1,25 +1,35 @@
-import pandas as pd
-
 class RSIStrategy:
     """
     Einfache RSI-basierte Strategie:
     - Kaufe, wenn RSI < 30
     - Verkaufe, wenn RSI > 70
+
+    RSI nach Wilder, gestreamt: pro Kerze nur skalare Updates,
+    keine Preis-Historie im Speicher.
     """
 
     def __init__(self, period=14):
         self.period = period
-        self.prices = []
+        self._prev_close = None
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self._seen = 0  # Anzahl verarbeiteter Deltas
+        self._last_ts = None
+        self._last_rsi = None
 
     def generate_signal(self, candle):
-        close = candle['close']
-        self.prices.append(close)
+        # dieselbe Kerze (gleicher timestamp) darf den Zustand nur einmal fortschreiben
+        ts = candle.get('timestamp')
+        if ts is not None and ts == self._last_ts:
+            rsi = self._last_rsi
+        else:
+            rsi = self.update(candle['close'])
+            self._last_ts = ts
+            self._last_rsi = rsi
 
-        if len(self.prices) < self.period + 1:
+        if rsi is None:
             return None  # nicht genug Daten
 
-        rsi = self._calculate_rsi()
-
         if rsi < 30:
             return 'buy'
         elif rsi > 70:
@@ -27,17 +37,37 @@ class RSIStrategy:
         else:
             return None
 
-    def _calculate_rsi(self):
-        prices = pd.Series(self.prices[-(self.period+1):])
-        delta = prices.diff().dropna()
-        gain = delta.where(delta > 0, 0)
-        loss = -delta.where(delta < 0, 0)
+    def update(self, close):
+        prev = self._prev_close
+        self._prev_close = close
+        if prev is None:
+            return None
 
-        avg_gain = gain.mean()
-        avg_loss = loss.mean()
+        delta = close - prev
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        p = self.period
+        self._seen += 1
 
-        if avg_loss == 0:
+        if self._seen < p:
+            # Anlaufphase: Summen fuer den ersten Mittelwert sammeln
+            self._avg_gain += gain
+            self._avg_loss += loss
+            return None
+        if self._seen == p:
+            # Seed: einfacher Mittelwert ueber die ersten p Deltas
+            self._avg_gain = (self._avg_gain + gain) / p
+            self._avg_loss = (self._avg_loss + loss) / p
+        else:
+            # Wilder-Glaettung
+            self._avg_gain = (self._avg_gain * (p - 1) + gain) / p
+            self._avg_loss = (self._avg_loss * (p - 1) + loss) / p
+
+        return self._calculate_rsi()
+
+    def _calculate_rsi(self):
+        if self._avg_loss == 0:
             return 100
 
-        rs = avg_gain / avg_loss
+        rs = self._avg_gain / self._avg_loss
         return 100 - (100 / (1 + rs))
@@ -23,10 +23,10 @@ Outputs:
      Combination, roi, winrate, num_trades
 """
 
-import sys, os, ast, json
+import sys, os, ast, json, functools
 import pandas as pd
 import numpy as np
-from collections import Counter, defaultdict
+from itertools import chain
 from datetime import datetime
 
 def log(msg):
@@ -36,8 +36,14 @@ def log(msg):
 def parse_combo(cell):
     if isinstance(cell, dict):
         return cell
+    return _parse_cached(str(cell))
+
+@functools.lru_cache(maxsize=None)
+def _parse_cached(s):
+    # identical Combination strings repeat across sweeps: parse each once
+    # (returned dict is shared between rows -> treat as read-only)
     try:
-        return ast.literal_eval(str(cell))
+        return ast.literal_eval(s)
     except Exception:
         return {}
 
@@ -71,54 +77,54 @@ def main():
     # parse Combination to dict
     combos = df["Combination"].map(parse_combo)
     df["_combo"] = combos
-    df["_keyset"] = combos.map(norm_keyset)
+    # Categorical: each key-set tuple stored once, rows carry int codes
+    df["_keyset"] = pd.Categorical(combos.map(norm_keyset))
 
     # --- 1) Summary per key-set ---
+    # one pass per key-set; numpy nan-reductions (skip NaN like Series.mean/std/...)
+    # keep the stats bit-identical to the former per-group Series version, as for
+    # the weight stats below (GroupBy.agg mean/std differ in the last digits)
     records = []
     total = len(df)
-    for kset, g in df.groupby("_keyset"):
-        rec = {
+    for kset, g in df.groupby("_keyset", observed=True):
+        roi = g["roi"].to_numpy(dtype=float)
+        records.append({
             "keyset": str(kset),
             "count": int(len(g)),
             "share": float(len(g)) / float(total),
-            "roi_mean": float(g["roi"].mean()),
-            "roi_median": float(g["roi"].median()),
-            "roi_std": float(g["roi"].std(ddof=1)) if len(g) > 1 else 0.0,
-            "roi_best": float(g["roi"].max()),
-            "winrate_mean": float(g["winrate"].mean()),
-            "trades_mean": float(g["num_trades"].mean()),
-        }
-        records.append(rec)
+            "roi_mean": float(np.nanmean(roi)),
+            "roi_median": float(np.nanmedian(roi)),
+            "roi_std": float(np.nanstd(roi, ddof=1)) if len(g) > 1 else 0.0,
+            "roi_best": float(np.nanmax(roi)),
+            "winrate_mean": float(np.nanmean(g["winrate"].to_numpy(dtype=float))),
+            "trades_mean": float(np.nanmean(g["num_trades"].to_numpy(dtype=float))),
+        })
     keyset_df = pd.DataFrame(records).sort_values(["roi_mean","roi_best"], ascending=[False, False])
     keyset_out = os.path.join(out_dir, "cluster_summary_by_keyset.csv")
     keyset_df.to_csv(keyset_out, index=False)
     log("Wrote {}".format(keyset_out))
 
     # --- 2) Weight stats per signal ---
-    # flatten weights per signal
-    weight_map = defaultdict(list)  # signal -> list of weights
-    rows_with_signal = Counter()
-    for row in df["_combo"]:
-        if not isinstance(row, dict):
-            continue
-        for k, w in row.items():
-            try:
-                weight_map[k].append(float(w))
-                rows_with_signal[k] += 1
-            except Exception:
-                continue
-
+    # flatten weights per signal into one long (signal, weight) frame
+    combos_ok = [c for c in df["_combo"] if isinstance(c, dict)]
+    long = pd.DataFrame({
+        "signal": list(chain.from_iterable(c.keys() for c in combos_ok)),
+        "weight": pd.to_numeric(pd.Series(list(chain.from_iterable(c.values() for c in combos_ok)), dtype=object), errors="coerce"),
+    }).dropna(subset=["weight"])
+
+    # one pass per signal (not per row); sort=False keeps first-seen signal order,
+    # numpy reductions keep the stats bit-identical to the former per-list version
     sig_rows = []
-    for sig, ws in weight_map.items():
-        arr = np.array(ws, dtype=float)
+    for sig, ws in long.groupby("signal", sort=False)["weight"]:
+        arr = ws.to_numpy(dtype=float)
         sig_rows.append({
             "signal": sig,
             "weight_mean": float(np.mean(arr)),
             "weight_std": float(np.std(arr, ddof=1)) if len(arr) > 1 else 0.0,
             "weight_min": float(np.min(arr)),
             "weight_max": float(np.max(arr)),
-            "rows_with_signal": int(rows_with_signal[sig]),
-            "share": float(rows_with_signal[sig]) / float(total),
+            "rows_with_signal": int(len(arr)),
+            "share": float(len(arr)) / float(total),
         })
     weights_df = pd.DataFrame(sig_rows).sort_values(["share","weight_mean"], ascending=[False, False])
     weights_out = os.path.join(out_dir, "weights_stats_by_signal.csv")
@@ -136,12 +142,14 @@ def main():
         best_keyset_str = keyset_df.iloc[0]["keyset"]
         try:
             # safe parse of tuple-string like "('macd','rsi')"
-            kset = eval(best_keyset_str, {"__builtins__": None}, {})
+            kset = ast.literal_eval(best_keyset_str)
             if not isinstance(kset, tuple):
                 kset = tuple()
         except Exception:
             kset = tuple()
-        mask = df["_keyset"].map(lambda ks: tuple(ks) == tuple(kset))
+        cats = df["_keyset"].cat.categories
+        code = cats.get_loc(kset) if kset in cats else -1
+        mask = df["_keyset"].cat.codes.to_numpy() == code
         rows_best = df.loc[mask, ["Combination","roi","winrate","num_trades"]].copy()
         best_rows_out = os.path.join(out_dir, "cluster_rows_top_keysets.csv")
         rows_best.to_csv(best_rows_out, index=False)
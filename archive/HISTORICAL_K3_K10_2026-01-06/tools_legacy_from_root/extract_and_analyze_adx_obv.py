@@ -15,15 +15,33 @@ Outputs (to <out_dir>):
   best_row.json               best single row
 """
 
-import sys, os, ast, json
+import sys, os, ast, json, re
 import pandas as pd
 import numpy as np
 from datetime import datetime
 
+try:  # optional: multithreaded CSV parser
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = "pyarrow"
+except ImportError:
+    CSV_ENGINE = "c"
+
+SWEEP_COLS = ["Combination", "roi", "winrate", "num_trades"]
+SWEEP_DTYPE = {"Combination": str, "roi": "float64", "winrate": "float64"}
+
 def log(msg):
     ts = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
     print("[{} UTC] {}".format(ts, msg), flush=True)
 
+def read_sweep(path):
+    """Read only the sweep columns used here (a column missing in the file stays absent)."""
+    header = pd.read_csv(path, nrows=0).columns
+    cols = [c for c in SWEEP_COLS if c in header]
+    dtype = {c: t for c, t in SWEEP_DTYPE.items() if c in cols}
+    # round_trip keeps the C fallback bit-identical to the pyarrow float parser
+    extra = {} if CSV_ENGINE == "pyarrow" else {"float_precision": "round_trip"}
+    return pd.read_csv(path, usecols=cols, dtype=dtype, engine=CSV_ENGINE, **extra)
+
 def parse_combo(cell):
     if isinstance(cell, dict):
         return cell
@@ -32,6 +50,32 @@ def parse_combo(cell):
     except Exception:
         return {}
 
+# Fast path for the sweep grammar {'name': number, ...}; anything else -> parse_combo.
+_ITEM = r"""(['"])([A-Za-z_][A-Za-z0-9_]*)\1\s*:\s*(-?(?:0|[1-9]\d*)(?:\.\d*)?(?:[eE][+-]?\d+)?)"""
+_ITEM_RE = re.compile(_ITEM)
+_COMBO_RE = re.compile(r"\{\s*(?:" + _ITEM + r"(?:\s*,\s*" + _ITEM.replace("\\1", "\\4") + r")*\s*,?)?\s*\}")
+
+def get_w(d, k):
+    for kk, vv in d.items():
+        if str(kk).lower() == k:
+            try:
+                return float(vv)
+            except Exception:
+                return None
+    return None
+
+def extract_weights(cell, keys):
+    """Weights for keys if the combination has exactly these signals (case-insensitive), else None."""
+    if isinstance(cell, str) and _COMBO_RE.fullmatch(cell.strip()):
+        d = {k: v for _, k, v in _ITEM_RE.findall(cell)}  # same duplicate-key rule as a dict literal
+    else:
+        d = parse_combo(cell)
+        if not isinstance(d, dict):
+            return None
+    if set(k.lower() for k in d.keys()) != set(keys):
+        return None
+    return tuple(get_w(d, k) for k in keys)
+
 def main():
     if len(sys.argv) < 3:
         print("Usage: python tools/extract_and_analyze_adx_obv.py <strategy_results.csv> <out_dir>")
@@ -42,49 +86,43 @@ def main():
     os.makedirs(out_dir, exist_ok=True)
 
     log("Loading {}".format(in_csv))
-    df = pd.read_csv(in_csv)
+    df = read_sweep(in_csv)
     if "Combination" not in df.columns:
         raise SystemExit("Column 'Combination' missing.")
 
-    # parse combinations
-    combos = df["Combination"].map(parse_combo)
-    df["_combo"] = combos
+    # cheap substring prefilter: only rows mentioning both signals reach the parser
+    comb = df["Combination"]
+    cand = np.flatnonzero((comb.str.contains("adx_signal", case=False, regex=False, na=False)
+                           & comb.str.contains("obv_signal", case=False, regex=False, na=False)).to_numpy())
 
-    def is_adx_obv(d):
-        if not isinstance(d, dict):
-            return False
-        ks = set(k.lower() for k in d.keys())
-        return ks == {"adx_signal", "obv_signal"}
+    # parse candidates: weights for exact adx+obv rows, None otherwise
+    wts = [extract_weights(c, ("adx_signal", "obv_signal")) for c in comb.to_numpy()[cand]]
+    hit = np.zeros(len(df), dtype=bool)
+    hit[cand[np.fromiter((w is not None for w in wts), dtype=bool, count=len(wts))]] = True
 
-    sub = df[df["_combo"].map(is_adx_obv)].copy()
+    sub = df.loc[hit].copy()
     if len(sub) == 0:
         raise SystemExit("No rows found with ('adx_signal','obv_signal').")
 
-    def get_w(d, key):
-        for kk, vv in d.items():
-            if str(kk).lower() == key:
-                try:
-                    return float(vv)
-                except Exception:
-                    return None
-        return None
-
-    sub["adx_weight"] = sub["_combo"].map(lambda d: get_w(d, "adx_signal"))
-    sub["obv_weight"] = sub["_combo"].map(lambda d: get_w(d, "obv_signal"))
+    wts = [w for w in wts if w is not None]
+    sub["adx_weight"] = pd.Series([w[0] for w in wts], index=sub.index, dtype=float)
+    sub["obv_weight"] = pd.Series([w[1] for w in wts], index=sub.index, dtype=float)
 
     keep = ["Combination","adx_weight","obv_weight","roi","winrate","num_trades"]
     sub = sub[keep].copy()
     main_out = os.path.join(out_dir, "adx_obv_strategies.csv")
     sub.to_csv(main_out, index=False)
 
+    # scalar reductions straight on the float64 arrays (nan* = pandas skipna semantics)
+    roi = sub["roi"].to_numpy(dtype=np.float64)
     summary = {
         "count": int(len(sub)),
-        "roi_mean": float(sub["roi"].mean()),
-        "roi_median": float(sub["roi"].median()),
-        "roi_std": float(sub["roi"].std(ddof=1)) if len(sub)>1 else 0.0,
-        "winrate_mean": float(sub["winrate"].mean()),
-        "trades_mean": float(sub["num_trades"].mean()),
-        "best_roi": float(sub["roi"].max())
+        "roi_mean": float(np.nanmean(roi)),
+        "roi_median": float(np.nanmedian(roi)),
+        "roi_std": float(np.nanstd(roi, ddof=1)) if len(sub)>1 else 0.0,
+        "winrate_mean": float(np.nanmean(sub["winrate"].to_numpy(dtype=np.float64))),
+        "trades_mean": float(np.nanmean(sub["num_trades"].to_numpy(dtype=np.float64))),
+        "best_roi": float(np.nanmax(roi))
     }
     pd.DataFrame([summary]).to_csv(os.path.join(out_dir, "summary.csv"), index=False)
 
@@ -100,12 +138,9 @@ def main():
         })
     pd.DataFrame(ws).to_csv(os.path.join(out_dir, "weight_stats.csv"), index=False)
 
-    def r01(x):
-        try: return float(np.round(float(x),1))
-        except: return np.nan
-
-    sub["_adx_r"]=sub["adx_weight"].map(r01)
-    sub["_obv_r"]=sub["obv_weight"].map(r01)
+    # weights are float64 already (NaN where missing): round the whole column at once
+    sub["_adx_r"]=np.round(sub["adx_weight"].to_numpy(dtype=np.float64),1)
+    sub["_obv_r"]=np.round(sub["obv_weight"].to_numpy(dtype=np.float64),1)
 
     grid=sub.groupby(["_adx_r","_obv_r"]).agg(
         count=("roi","size"),
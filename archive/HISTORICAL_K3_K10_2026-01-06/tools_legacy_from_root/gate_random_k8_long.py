@@ -14,6 +14,7 @@ import argparse
 import sys
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 
@@ -38,20 +39,23 @@ def main():
     if not random_results.exists():
         die(f"Random results not found: {random_results}")
 
-    seed = pd.read_csv(seed_csv)
     need_seed = {"roi", "winrate", "Combination"}
-    if not need_seed.issubset(seed.columns):
-        die(f"Seed CSV missing columns: {need_seed - set(seed.columns)}")
+    seed_header = pd.read_csv(seed_csv, nrows=0).columns
+    if not need_seed.issubset(seed_header):
+        die(f"Seed CSV missing columns: {need_seed - set(seed_header)}")
+    # only the gate inputs are needed from the seed basis
+    seed = pd.read_csv(seed_csv, usecols=["roi", "winrate", "Combination"])
 
     seed["roi"] = pd.to_numeric(seed["roi"], errors="coerce")
     seed["winrate"] = pd.to_numeric(seed["winrate"], errors="coerce")
-    seed = seed.dropna(subset=["roi", "winrate", "Combination"]).copy()
+    seed = seed.dropna(subset=["roi", "winrate", "Combination"])
 
     if len(seed) < 10:
         die(f"Seed CSV too small after cleaning: {len(seed)} rows")
 
-    seed_roi_p90 = float(seed["roi"].quantile(0.90))
-    seed_wr_med = float(seed["winrate"].median())
+    # NaNs are dropped above: plain numpy reductions (linear quantile = pandas default)
+    seed_roi_p90 = float(np.quantile(seed["roi"].to_numpy(dtype=np.float64), 0.90))
+    seed_wr_med = float(np.median(seed["winrate"].to_numpy(dtype=np.float64)))
 
     rnd = pd.read_csv(random_results)
     need_rnd = {"roi", "winrate", "Combination"}
@@ -60,9 +64,9 @@ def main():
 
     rnd["roi"] = pd.to_numeric(rnd["roi"], errors="coerce")
     rnd["winrate"] = pd.to_numeric(rnd["winrate"], errors="coerce")
-    rnd = rnd.dropna(subset=["roi", "winrate", "Combination"]).copy()
+    rnd = rnd.dropna(subset=["roi", "winrate", "Combination"])
 
-    passed = rnd[(rnd["roi"] > seed_roi_p90) & (rnd["winrate"] > seed_wr_med)].copy()
+    passed = rnd[(rnd["roi"] > seed_roi_p90) & (rnd["winrate"] > seed_wr_med)]
 
     out_path.parent.mkdir(parents=True, exist_ok=True)
     passed.to_csv(out_path, index=False)
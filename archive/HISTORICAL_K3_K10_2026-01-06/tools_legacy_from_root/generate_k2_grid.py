@@ -6,17 +6,23 @@ Usage:
   python tools/generate_k2_grid.py out.csv mfi rsi roc adx cci obv
 Creates column: Combination  (JSON dict with two signals and weights)
 """
-import sys, json
+import sys, json, math
 import pandas as pd
 from itertools import combinations
 
 def grid(step=0.1):
-    vals = []
-    v = 0.1
-    while v <= 1.000001:
-        vals.append(round(v, 1))
-        v += step
-    return vals
+    # i-th value as 0.1 + i*step (no float accumulator drift), rounded to 0.1 as before
+    n = int(math.floor((1.000001 - 0.1) / step)) + 1
+    return [round(0.1 + i * step, 1) for i in range(n)]
+
+def pair_rows(a, b, wstr):
+    """Combination strings for one pair, identical to json.dumps({..}, sort_keys=True) per row."""
+    ka, kb = json.dumps(f"{a}_signal"), json.dumps(f"{b}_signal")
+    if ka == kb:  # same signal twice: the dict keeps only the second weight
+        return ['{%s: %s}' % (ka, y) for _ in wstr for y in wstr]
+    if f"{a}_signal" < f"{b}_signal":
+        return ['{%s: %s, %s: %s}' % (ka, x, kb, y) for x in wstr for y in wstr]
+    return ['{%s: %s, %s: %s}' % (kb, y, ka, x) for x in wstr for y in wstr]
 
 def main():
     if len(sys.argv) < 3:
@@ -26,13 +32,11 @@ def main():
     sigs = sys.argv[2:]
     pairs = list(combinations(sigs, 2))
     vals = grid(0.1)
+    wstr = [json.dumps(v) for v in vals]  # serialize each weight once, not per row
     rows = []
     for a,b in pairs:
-        for wa in vals:
-            for wb in vals:
-                combo = {f"{a}_signal": wa, f"{b}_signal": wb}
-                rows.append({"Combination": json.dumps(combo, sort_keys=True)})
-    pd.DataFrame(rows).to_csv(out_csv, index=False)
+        rows.extend(pair_rows(a, b, wstr))
+    pd.DataFrame({"Combination": rows}).to_csv(out_csv, index=False)
     print("pairs:", len(pairs), "rows:", len(rows), "->", out_csv)
 
 if __name__ == "__main__":
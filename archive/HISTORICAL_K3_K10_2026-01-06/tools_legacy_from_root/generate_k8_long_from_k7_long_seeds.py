@@ -14,13 +14,15 @@
 # It only generates candidates for the next analyze step.
 
 import argparse
+import ast
 import json
+import math
 import os
 import random
 import sys
 from datetime import datetime, timezone
 from itertools import combinations
-from typing import Dict, List, Tuple
+from typing import Dict, List
 
 import pandas as pd
 
@@ -29,6 +31,11 @@ SIGNALS_12 = [
     "adx", "atr", "bollinger", "cci", "ema50", "ma200",
     "macd", "mfi", "obv", "roc", "rsi", "stoch"
 ]
+SIGNALS_12_SET = frozenset(SIGNALS_12)
+# SIGNALS_12 is in sorted order, so walking it visits keys in canonical (sort_keys) order
+assert SIGNALS_12 == sorted(SIGNALS_12)
+# '"sig":' prefix per signal, serialized once at import
+KEY_TOKS = {s: json.dumps(s) + ":" for s in SIGNALS_12}
 
 
 def die(msg: str, code: int = 1) -> None:
@@ -41,23 +48,31 @@ def safe_mkdir(path: str) -> None:
         os.makedirs(path, exist_ok=True)
 
 
-def parse_combo(s: str) -> Dict[str, float]:
-    # Accept JSON-like or Python-dict-like strings.
+def _signal_weights(d) -> Dict[str, float]:
+    # One pass: every value must be numeric (as before), only SIGNALS_12 keys are kept, rounded.
+    out = {}
+    for k, v in d.items():
+        v = float(v)
+        k = str(k)
+        if k in SIGNALS_12_SET:
+            out[k] = round1(v)
+    return out
+
+
+def parse_seed(s: str) -> Dict[str, float]:
+    # Accept JSON-like or Python-dict-like strings; returns the rounded SIGNALS_12 weights.
     s = s.strip()
     try:
-        # First try JSON
-        if s.startswith("{") and '"' in s:
-            d = json.loads(s)
-            return {str(k): float(v) for k, v in d.items()}
+        # Canonical seeds are JSON: plain json.loads, the literal parser only as fallback
+        return _signal_weights(json.loads(s))
     except Exception:
         pass
     try:
         # Fallback: python literal dict
-        import ast
         d = ast.literal_eval(s)
         if not isinstance(d, dict):
             raise ValueError("Combination is not a dict")
-        return {str(k): float(v) for k, v in d.items()}
+        return _signal_weights(d)
     except Exception as e:
         raise ValueError(f"Cannot parse Combination: {e}")
 
@@ -73,17 +88,22 @@ def round1(x: float) -> float:
     return round(float(x) + 1e-12, 1)
 
 
-def generate_expansions_for_seed(seed: Dict[str, float], weights: List[float]) -> List[Dict[str, float]]:
+def expansion_strings_for_seed(seed: Dict[str, float], weight_toks: List[str]) -> List[str]:
     # K8 from K7: add one new signal not in seed, choose its weight.
     # Keep existing weights unchanged.
-    existing = set(seed.keys())
-    missing = [s for s in SIGNALS_12 if s not in existing]
+    # Same strings as combo_to_str() on each expanded dict, but the seed's "key":weight
+    # items are serialized once and the new item is spliced in at its sorted position.
+    # Seeds only hold SIGNALS_12 keys: one ordered walk gives each insert position.
+    toks = [KEY_TOKS[k] + json.dumps(round(float(seed[k]), 1)) for k in SIGNALS_12 if k in seed]
     out = []
-    for add_sig in missing:
-        for w in weights:
-            d = dict(seed)
-            d[add_sig] = w
-            out.append(d)
+    pos = 0  # seed keys sorting before add_sig
+    for add_sig in SIGNALS_12:
+        if add_sig in seed:
+            pos += 1
+            continue
+        head = "{" + "".join(t + "," for t in toks[:pos]) + KEY_TOKS[add_sig]
+        tail = "".join("," + t for t in toks[pos:]) + "}"
+        out.extend(head + wt + tail for wt in weight_toks)
     return out
 
 
@@ -112,11 +132,10 @@ def main() -> None:
     # Parse seed combinations
     seeds: List[Dict[str, float]] = []
     bad = 0
-    for s in df["Combination"].astype(str).tolist():
+    for s in df["Combination"].to_numpy():
         try:
-            d = parse_combo(s)
             # Keep only valid signals, ignore extras (but warn)
-            d2 = {k: round1(v) for k, v in d.items() if k in SIGNALS_12}
+            d2 = parse_seed(str(s))
             if len(d2) < 1:
                 raise ValueError("empty after filtering to SIGNALS_12")
             seeds.append(d2)
@@ -129,12 +148,10 @@ def main() -> None:
         print(f"[warn] Failed to parse {bad} seed rows (skipped).")
 
     # Weight grid
+    # i-th weight as min_w + i*step instead of a running float sum (no accumulated drift)
     step = args.weight_step
-    w = args.min_w
-    weights = []
-    while w <= args.max_w + 1e-9:
-        weights.append(round1(w))
-        w += step
+    n_w = int(math.floor((args.max_w - args.min_w) / step + 1e-9)) + 1 if args.max_w + 1e-9 >= args.min_w else 0
+    weights = [round1(args.min_w + i * step) for i in range(n_w)]
     if not weights:
         die("Weight grid empty. Check --min-w/--max-w/--weight-step.")
 
@@ -142,14 +159,13 @@ def main() -> None:
     print(f"[ok] Seeds parsed: {len(seeds)}")
     print(f"[ok] Weight grid: {weights[0]}..{weights[-1]} step={step} (n={len(weights)})")
 
-    exp_rows: List[Tuple[str, str]] = []  # (Combination, source)
+    weight_toks = [json.dumps(round(w, 1)) for w in weights]
+    exp_combos: List[str] = []
     for d in seeds:
         # K7 -> K8 expansions (add one new signal)
-        exps = generate_expansions_for_seed(d, weights)
-        for e in exps:
-            exp_rows.append((combo_to_str(e), "seed_expansion"))
+        exp_combos.extend(expansion_strings_for_seed(d, weight_toks))
 
-    df_seeds = pd.DataFrame(exp_rows, columns=["Combination", "source"])
+    df_seeds = pd.DataFrame({"Combination": exp_combos, "source": "seed_expansion"})
     df_seeds = df_seeds.drop_duplicates(subset=["Combination"]).copy()
 
     seed_count = len(df_seeds)
@@ -174,9 +190,9 @@ def main() -> None:
     df_rand = pd.DataFrame(rand_rows, columns=["Combination", "source"])
     df_rand = df_rand.drop_duplicates(subset=["Combination"]).copy()
 
-    # POOL
-    df_pool = pd.concat([df_seeds, df_rand], ignore_index=True)
-    df_pool = df_pool.drop_duplicates(subset=["Combination"], keep="first").copy()
+    # POOL: both parts are deduped already, only RANDOM rows that repeat a SEED row can collide
+    rand_new = ~df_rand["Combination"].isin(df_seeds["Combination"])
+    df_pool = pd.concat([df_seeds, df_rand[rand_new]], ignore_index=True)
 
     ts = datetime.now(timezone.utc).strftime("%Y-%m-%d_%H-%M-%S")
     seeds_path = os.path.join(outdir, f"strategies_k8_long_SEEDS_{ts}.csv")
@@ -30,8 +30,15 @@ def full_grid(step):
     n = int(round((1.0 - 0.1) / step)) + 1
     return [clamp_round(0.1 + i * step, step) for i in range(n)]
 
-def combo_key(combo):
-    return json.dumps(combo, sort_keys=True)
+def combo_json(kset, weights, ktok, wtok):
+    # same string as json.dumps(dict(zip(kset, weights)), sort_keys=True) for a sorted kset;
+    # ktok / wtok cache json.dumps per distinct key / weight
+    parts = []
+    for k, w in zip(kset, weights):
+        if k not in ktok: ktok[k] = json.dumps(k)
+        if w not in wtok: wtok[w] = json.dumps(w)
+        parts.append(ktok[k] + ": " + wtok[w])
+    return "{" + ", ".join(parts) + "}"
 
 def main():
     ap = argparse.ArgumentParser(description="Generate weight variants from top strategies.")
@@ -50,8 +57,10 @@ def main():
 
     base = df["Combination"].head(args.limit).tolist()
 
+    # dedup on (kset, weight tuple); JSON is only built for the survivors
     seen = set()
-    out_rows = []
+    survivors = []
+    mesh_rows = []
 
     # group by signal key-set to optionally build full meshes
     by_keys = {}
@@ -65,27 +74,27 @@ def main():
     for kset, combos in by_keys.items():
         if args.full_grid == 1:
             # Build full mesh for this signal set at given step
-            axes = [full_grid(args.step) for _ in kset]
-            for weights in product(*axes):
-                combo = {k: clamp_round(w, args.step) for k, w in zip(kset, weights)}
-                key = combo_key(combo)
-                if key in seen: 
-                    continue
-                seen.add(key)
-                out_rows.append({"Combination": key})
+            # Each kset is meshed once, so after an order-preserving dedup of the axis every product
+            # tuple is new (first occurrences keep product order): no seen-set needed, and the rows
+            # are joined straight from preformatted '"key": weight' tokens
+            axis = list(dict.fromkeys(clamp_round(w, args.step) for w in full_grid(args.step)))
+            parts = [[json.dumps(k) + ": " + json.dumps(w) for w in axis] for k in kset]
+            mesh_rows.extend("{" + ", ".join(t) + "}" for t in product(*parts))
         else:
             # Local neighborhoods around each base combo
             for c in combos:
-                grids = [neighbor_grid(float(c[k]), args.step, args.radius) for k in kset]
+                grids = [[clamp_round(w, args.step) for w in neighbor_grid(float(c[k]), args.step, args.radius)]
+                         for k in kset]
                 for weights in product(*grids):
-                    combo = {k: clamp_round(w, args.step) for k, w in zip(kset, weights)}
-                    key = combo_key(combo)
+                    key = (kset, weights)
                     if key in seen:
                         continue
                     seen.add(key)
-                    out_rows.append({"Combination": key})
+                    survivors.append(key)
 
-    out_df = pd.DataFrame(out_rows)
+    ktok, wtok = {}, {}
+    rows = mesh_rows or [combo_json(k, w, ktok, wtok) for k, w in survivors]
+    out_df = pd.DataFrame({"Combination": rows}) if rows else pd.DataFrame()
     out_df.to_csv(args.output_csv, index=False)
     print("Wrote", len(out_df), "variants to", args.output_csv)
 
@@ -16,8 +16,58 @@ Example:
 import sys, os
 import pandas as pd
 
+try:  # optional: multithreaded, typed CSV parsing
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    ARROW_INVALID = (pa.ArrowInvalid,)
+except ImportError:
+    pa = pa_csv = None
+    ARROW_INVALID = ()
+
 TARGET_COLS = ["mfi", "mfi_signal", "rsi", "rsi_signal"]
 
+# Streaming keeps peak memory at one chunk instead of ~2x the file.
+CHUNK_ROWS = 1_000_000        # pandas C engine
+ARROW_BLOCK_BYTES = 64 << 20  # pyarrow reader
+
+def iter_csv_typed(path, numeric_cols, numeric_as_text=False):
+    """Yield DataFrame chunks: numeric_cols as float64, every other column verbatim as text."""
+    header = pd.read_csv(path, nrows=0).columns
+    passthrough = [c for c in header if c not in numeric_cols]
+    if pa_csv is None:
+        yield from pd.read_csv(path, dtype=dict.fromkeys(passthrough, str),
+                               float_precision="round_trip", chunksize=CHUNK_ROWS)
+        return
+    num_type = pa.string() if numeric_as_text else pa.float64()
+    types = dict.fromkeys(passthrough, pa.string())
+    types.update({c: num_type for c in header if c in numeric_cols})
+    reader = pa_csv.open_csv(
+        path,
+        read_options=pa_csv.ReadOptions(block_size=ARROW_BLOCK_BYTES),
+        convert_options=pa_csv.ConvertOptions(column_types=types, strings_can_be_null=True),
+    )
+    for batch in reader:
+        yield batch.to_pandas()
+
+def invert_chunk(df, cols):
+    for col in cols:
+        s = df[col]
+        if s.dtype == object:  # stray non-numeric cells only
+            num = pd.to_numeric(s, errors="coerce")
+            ok = num.notna()
+            num[ok] = s[ok].astype("float64")  # exact parse, same digits as the typed path
+            s = num
+        df[col] = -s.astype("float64", copy=False).fillna(0.0)
+    return df
+
+def write_inverted(inp, outp, found, numeric_as_text=False):
+    first = True
+    for chunk in iter_csv_typed(inp, TARGET_COLS, numeric_as_text):
+        invert_chunk(chunk, found).to_csv(outp, index=False, mode="w" if first else "a", header=first)
+        first = False
+    if first:  # header-only input
+        pd.read_csv(inp, nrows=0).to_csv(outp, index=False)
+
 def main():
     if len(sys.argv) < 3:
         print("Usage: python tools/add_inverted_short_signals.py <input_csv> <output_csv>")
@@ -26,17 +76,17 @@ def main():
     if not os.path.isfile(inp):
         print("ERROR: input_csv not found:", inp)
         sys.exit(3)
-    df = pd.read_csv(inp)
-    found = []
-    for col in TARGET_COLS:
-        if col in df.columns:
-            df[col] = -1.0 * pd.to_numeric(df[col], errors="coerce").fillna(0.0)
-            found.append(col)
+    header = pd.read_csv(inp, nrows=0).columns
+    found = [col for col in TARGET_COLS if col in header]
+    try:
+        write_inverted(inp, outp, found)
+    except ARROW_INVALID:
+        # stray non-numeric cells: rewrite from scratch with targets read as text
+        write_inverted(inp, outp, found, numeric_as_text=True)
     if not found:
         print("WARNING: none of the target columns found. Wrote unchanged copy.")
     else:
         print("Inverted columns:", ", ".join(found))
-    df.to_csv(outp, index=False)
     print("Wrote:", outp)
 
 if __name__ == "__main__":
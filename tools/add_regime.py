@@ -6,12 +6,30 @@
 #   bear: close<ma200, ema50<ma200, roc<0, adx>=ADX_MIN
 
 import argparse
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
+try:  # optional: multithreaded, typ-fester CSV-Parser
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = pa_csv = None
+
 IN  = Path("data/price_data_with_signals.csv")
 OUT = Path("data/price_data_with_signals_regime.csv")
 
+def read_csv_typed(path, numeric_cols):
+    """numeric_cols als float64 parsen, alle anderen Spalten unveraendert als Text durchreichen."""
+    header = pd.read_csv(path, nrows=0).columns
+    passthrough = [c for c in header if c not in numeric_cols]
+    if pa_csv is None:
+        return pd.read_csv(path, dtype=dict.fromkeys(passthrough, str), float_precision="round_trip")
+    types = dict.fromkeys(passthrough, pa.string())
+    types.update({c: pa.float64() for c in header if c in numeric_cols})
+    opts = pa_csv.ConvertOptions(column_types=types, strings_can_be_null=True)
+    return pa_csv.read_csv(path, convert_options=opts).to_pandas()
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--adx-min", type=float, default=15.0)  # vorher 20.0
@@ -21,9 +39,9 @@ def main():
     if not IN.exists():
         raise FileNotFoundError(f"Missing: {IN}")
 
-    df = pd.read_csv(IN)
-
     need = ["close", "ma200", "ema50", "roc", "adx"]
+    df = read_csv_typed(IN, need)
+
     for col in need:
         if col not in df.columns:
             raise KeyError(f"Required column missing: {col}")
@@ -31,18 +49,17 @@ def main():
     bull = (df["close"] > df["ma200"]) & (df["ema50"] > df["ma200"]) & (df["roc"] > 0) & (df["adx"] >= adx_min)
     bear = (df["close"] < df["ma200"]) & (df["ema50"] < df["ma200"]) & (df["roc"] < 0) & (df["adx"] >= adx_min)
 
-    regime = pd.Series("side", index=df.index)
-    regime = regime.mask(bull, "bull")
-    regime = regime.mask(bear, "bear")
-
-    regime_signal = pd.Series(0, index=df.index)
-    regime_signal = regime_signal.mask(bull, 1)
-    regime_signal = regime_signal.mask(bear, -1)
+    # bull/bear schliessen sich aus; bear zuerst = gleiche Prioritaet wie frueher (bear ueberschreibt)
+    conds = [bear.to_numpy(), bull.to_numpy()]
 
-    df["market_regime"] = regime
-    df["regime_signal"] = regime_signal.astype(int)
-    df["regime_bull"]   = (regime == "bull").astype(int)
-    df["regime_bear"]   = (regime == "bear").astype(int)
+    # Codes direkt als int8 -> kein temporaeres String-Array pro Zeile
+    df["market_regime"] = pd.Categorical.from_codes(
+        np.select(conds, [np.int8(2), np.int8(1)], default=np.int8(0)),
+        categories=["side", "bull", "bear"],
+    )
+    df["regime_signal"] = np.select(conds, [np.int8(-1), np.int8(1)], default=np.int8(0)).astype(np.int8)
+    df["regime_bull"]   = (bull & ~bear).to_numpy().astype(np.int8)
+    df["regime_bear"]   = bear.to_numpy().astype(np.int8)
 
     df.to_csv(OUT, index=False)
     print(f"[INFO] Wrote: {OUT}  rows={len(df)}  adx_min={adx_min}")
@@ -30,7 +30,6 @@ import os
 from pathlib import Path
 from typing import List
 
-import numpy as np
 import pandas as pd
 
 
@@ -59,11 +58,17 @@ def ok(msg: str) -> None:
     print(f"[ok] {msg}")
 
 
+NS_PER_MIN = 60 * 1_000_000_000
+
+
+def _epoch_ns(ts: pd.Series):
+    # int64 ns since epoch; one modulo instead of .dt.minute/.dt.second accessors
+    return ts.dt.as_unit("ns").array.asi8
+
+
 def _is_5m_aligned(ts: pd.Series) -> bool:
     # ts must be UTC-aware datetime64[ns, UTC]
-    mins = ts.dt.minute
-    secs = ts.dt.second
-    return bool(((mins % 5) == 0).all() and (secs == 0).all())
+    return bool((_epoch_ns(ts) % (5 * NS_PER_MIN) == 0).all())
 
 
 def _default_out_path(inp: str) -> str:
@@ -77,17 +82,6 @@ def _default_out_path(inp: str) -> str:
     return str(p.parent / out_name)
 
 
-def _last_non_nan(x: pd.Series):
-    # Return last non-NaN if any, else NaN
-    if x is None or len(x) == 0:
-        return np.nan
-    # faster: find last valid index
-    idx = x.last_valid_index()
-    if idx is None:
-        return np.nan
-    return x.loc[idx]
-
-
 def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--in", dest="inp", required=True, help="Input 1m GS-compatible CSV path")
@@ -112,7 +106,7 @@ def main() -> int:
 
     # Parse timestamp_utc
     ts = pd.to_datetime(df["timestamp_utc"], utc=True, errors="raise", format="mixed")
-    if (ts.dt.second != 0).any():
+    if (_epoch_ns(ts) % NS_PER_MIN != 0).any():
         die("timestamp_utc has non-zero seconds (not minute-aligned). Fix upstream first.")
     if not ts.is_monotonic_increasing:
         die("timestamp_utc is not monotonic increasing. Fix upstream first.")
@@ -147,7 +141,9 @@ def main() -> int:
     out_df = pd.concat([ohlc, vol], axis=1)
 
     if keep_optional:
-        opt = df[keep_optional].resample(args.rule).apply(_last_non_nan)
+        # Resampler.last() skips NaN per column -> last non-NaN in bucket, NaN if none
+        # (no ffill: an all-NaN bucket must stay NaN, not inherit the previous bucket)
+        opt = df[keep_optional].resample(args.rule).last()
         out_df = pd.concat([out_df, opt], axis=1)
 
     # Drop completely empty buckets
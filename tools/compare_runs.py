@@ -8,8 +8,10 @@ Usage:
 import argparse
 import ast
 import csv
+import functools
 import json
 import os
+import re
 import pandas as pd
 from datetime import datetime
 
@@ -18,6 +20,11 @@ KEY_MAP = {
     "ma200": "ma200_signal", "stoch": "stoch_signal", "atr": "atr_signal", "ema50": "ema50_signal"
 }
 
+# Fast path for the grid-search grammar: {'name': number, ...} (single or double quotes).
+_ITEM = r"""(['"])([A-Za-z_][A-Za-z0-9_]*)\1\s*:\s*(-?(?:0|[1-9]\d*)(?:\.\d*)?(?:[eE][+-]?\d+)?)"""
+_ITEM_RE = re.compile(_ITEM)
+_COMBO_RE = re.compile(r"\{\s*(?:" + _ITEM + r"(?:\s*,\s*" + _ITEM.replace("\\1", "\\4") + r")*\s*,?)?\s*\}")
+
 def parse_combo_string(s):
     """
     Parse a combination string into a dict of normalized signal keys.
@@ -26,6 +33,17 @@ def parse_combo_string(s):
     """
     if pd.isna(s):
         return {}
+    return dict(_parse_cached(s))
+
+@functools.lru_cache(maxsize=None)
+def _parse_cached(s):
+    """Grid sweeps repeat the same combination strings; parse each one only once.
+    Returns a hashable tuple of sorted (normalized_key, weight) pairs."""
+    if isinstance(s, str) and _COMBO_RE.fullmatch(s.strip()):
+        raw = {k: v for _, k, v in _ITEM_RE.findall(s)}  # same duplicate-key rule as a dict literal
+        nd = {KEY_MAP.get(k, k): float(v) for k, v in raw.items()}
+        return tuple(sorted(nd.items()))
+    # anything else: full literal parser
     try:
         d = ast.literal_eval(s)
         nd = {}
@@ -37,7 +55,7 @@ def parse_combo_string(s):
             except Exception:
                 nv = float(str(v).replace(',', '.'))
             nd[nk] = nv
-        return dict(sorted(nd.items()))
+        return tuple(sorted(nd.items()))
     except Exception:
         # fallback: try to interpret as JSON-ish
         try:
@@ -46,9 +64,9 @@ def parse_combo_string(s):
             for k,v in js.items():
                 nk = KEY_MAP.get(k, k)
                 nd[nk] = float(v)
-            return dict(sorted(nd.items()))
+            return tuple(sorted(nd.items()))
         except Exception:
-            return {}
+            return ()
 
 def combo_to_stable_string(d):
     """Convert normalized dict to stable string ordering keys alphabetically."""
@@ -3,18 +3,30 @@
 """
 Binance 1m Downloader (Spot/Futures) mit Resume, Rate-Limit, Merge.
 OUTPUT:
-  - data/raw/*.csv  (Chunk-Dateien)
+  - data/raw/*.csv  (Chunk-Dateien, eine pro UTC-Tag; *.parquet bei --format parquet)
   - data/btcusdt_1m_spot.csv (zusammengeführt, duplikatfrei, sortiert)
+  open_time_iso nur mit --emit-iso (strftime je Zeile ist der teuerste Schritt; Folge-Tools nutzen open_time)
 """
 
-import os, sys, time, argparse
+import os, sys, time, argparse, threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from dateutil import parser as dtparser
+import numpy as np
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+try:  # optional: schnelleres JSON-Decoding der Kline-Arrays
+    import orjson
+except ImportError:
+    orjson = None
 
 SPOT_ENDPOINT = "https://api.binance.com/api/v3/klines"
 FUTU_ENDPOINT = "https://fapi.binance.com/fapi/v1/klines"
+MS_PER_DAY = 86_400_000
+# Request-Weight je Markt: (Budget pro Minute und IP, Weight eines klines-Requests mit limit=1000)
+WEIGHT_BUDGET = {"spot": (6000, 2), "futures": (2400, 5)}
 
 def to_ms(dt: datetime) -> int:
     return int(dt.replace(tzinfo=timezone.utc).timestamp() * 1000)
@@ -36,50 +48,120 @@ def pick_endpoint(market: str) -> str:
         return FUTU_ENDPOINT
     raise ValueError("market must be 'spot' or 'futures'")
 
-def fetch_klines(session, endpoint, symbol, start_ms, end_ms, limit=1000, sleep_sec=0.6, max_retries=8):
+def min_request_interval(market, sleep_sec, workers):
+    """Mindestabstand zwischen zwei Requests ueber alle Worker: das Weight-Budget des Markts
+    darf nicht ueberschritten werden, sleep_sec/workers bleibt die Untergrenze."""
+    budget, weight = WEIGHT_BUDGET[market]
+    return max(60.0 / (budget / weight), sleep_sec / workers)
+
+class RateLimiter:
+    """Thread-sicherer Mindestabstand zwischen zwei Requests, gemeinsam fuer alle Worker."""
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def pause(self, seconds):
+        """Alle Worker anhalten (429/418 mit Retry-After): naechster Slot fruehestens in seconds."""
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+def make_session(pool_size, max_retries=8, sleep_sec=0.6):
+    """Session mit Connection-Pool fuer alle Worker: Keep-Alive statt neuem TLS-Handshake pro Request.
+    Retries fuer 5xx/Verbindungsfehler macht urllib3 mit exponentiellem Backoff. 429/418 nicht:
+    die behandelt fetch_klines ueber den gemeinsamen RateLimiter, damit alle Worker pausieren."""
+    retry = Retry(total=max_retries, backoff_factor=sleep_sec,
+                  status_forcelist=(500, 502, 503, 504),
+                  respect_retry_after_header=True, allowed_methods=frozenset(["GET"]))
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip", "User-Agent": "sniper-bot/1.0"})
+    return session
+
+def fetch_klines(session, endpoint, symbol, start_ms, end_ms, limit=1000, limiter=None, max_retries=8, backoff=0.6):
+    # 5xx-Retries stecken im Adapter der Session (make_session); 429/418 hier
     params = dict(symbol=symbol, interval="1m", startTime=start_ms, endTime=end_ms, limit=limit)
-    for attempt in range(1, max_retries+1):
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            limiter.wait()
+        r = session.get(endpoint, params=params, timeout=30)
+        if r.status_code not in (418, 429) or attempt == max_retries:
+            break
+        # 429 = Limit erreicht, 418 = IP-Ban: Retry-After gilt fuer die IP, also fuer alle Worker.
+        # Weiterfeuern der anderen Worker waehrend der Sperre verlaengert bei Binance den Ban.
         try:
-            r = session.get(endpoint, params=params, timeout=30)
-            if r.status_code == 429:
-                time.sleep(sleep_sec * attempt); continue
-            r.raise_for_status()
-            return r.json()
-        except Exception:
-            if attempt >= max_retries: raise
-            time.sleep(sleep_sec * attempt)
-    return []
-
-def klines_to_df(klines):
-    cols = [
-        "open_time","open","high","low","close","volume",
-        "close_time","quote_asset_volume","number_of_trades",
-        "taker_buy_base_asset_volume","taker_buy_quote_asset_volume","ignore"
-    ]
-    df = pd.DataFrame(klines, columns=cols)
-    for c in ["open","high","low","close","volume","quote_asset_volume",
-              "taker_buy_base_asset_volume","taker_buy_quote_asset_volume"]:
-        df[c] = pd.to_numeric(df[c], errors="coerce")
-    for c in ["open_time","close_time","number_of_trades"]:
-        df[c] = pd.to_numeric(df[c], errors="coerce", downcast="integer")
-    df["open_time_iso"] = pd.to_datetime(df["open_time"], unit="ms", utc=True).dt.strftime("%Y-%m-%dT%H:%M:%SZ")
-    df = df.drop(columns=["ignore"])
+            delay = float(r.headers.get("Retry-After", ""))
+        except ValueError:
+            delay = backoff * 2 ** attempt
+        if limiter is not None:
+            limiter.pause(delay)
+        else:
+            time.sleep(delay)
+    r.raise_for_status()
+    # r.content ist bereits entpackt (gzip); orjson falls installiert, sonst stdlib
+    return orjson.loads(r.content) if orjson is not None else r.json()
+
+# Binance-Kline-Layout: Spaltenposition -> (Name, dtype); Index 11 ("ignore") entfaellt
+# feste Integer-Typen statt downcast je Chunk (int8/int16/... -> uneinheitlich beim concat)
+# Preise/Volumen bleiben float64: float32 hat nur ~7 signifikante Stellen
+KLINE_FIELDS = [
+    (0, "open_time", np.int64), (1, "open", np.float64), (2, "high", np.float64),
+    (3, "low", np.float64), (4, "close", np.float64), (5, "volume", np.float64),
+    (6, "close_time", np.int64), (7, "quote_asset_volume", np.float64),
+    (8, "number_of_trades", np.int32), (9, "taker_buy_base_asset_volume", np.float64),
+    (10, "taker_buy_quote_asset_volume", np.float64),
+]
+
+def iso_minutes(open_time_ms):
+    return pd.to_datetime(np.asarray(open_time_ms), unit="ms", utc=True).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def klines_to_df(klines, emit_iso=False):
+    # direkt spaltenweise typisieren statt object-DataFrame + pd.to_numeric je Spalte
+    # leere Antwort (Bereich ohne Daten) -> leerer Frame mit denselben Spalten/dtypes
+    cols = list(zip(*klines)) if len(klines) else [()] * len(KLINE_FIELDS)
+    data = {name: np.array(cols[i], dtype=dt) for i, name, dt in KLINE_FIELDS}
     final_cols = [
         "open_time","open_time_iso","open","high","low","close","volume",
         "close_time","quote_asset_volume","number_of_trades",
         "taker_buy_base_asset_volume","taker_buy_quote_asset_volume"
     ]
-    return df[final_cols]
+    if emit_iso:
+        data["open_time_iso"] = np.asarray(iso_minutes(data["open_time"]), dtype=object)
+    else:
+        final_cols.remove("open_time_iso")
+    return pd.DataFrame(data, columns=final_cols)
 
 def existing_chunks(prefix):
     return sorted([os.path.join("data","raw",f) for f in os.listdir("data/raw")
-                   if f.startswith(prefix) and f.endswith(".csv")])
+                   if f.startswith(prefix) and f.endswith((".csv", ".parquet"))])
+
+def read_chunk(path):
+    return pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+
+def write_chunk(df, prefix, ext):
+    first_ts = int(df["open_time"].iloc[0]); last_ts = int(df["open_time"].iloc[-1])
+    fpath = os.path.join("data","raw", f"{prefix}{first_ts}_{last_ts}.{ext}")
+    if ext == "parquet":
+        df.to_parquet(fpath, index=False, engine="pyarrow", compression="snappy")
+    else:
+        df.to_csv(fpath, index=False)
+    return fpath
 
 def infer_resume_start_from_chunks(prefix):
     files = existing_chunks(prefix)
     if not files: return None
     try:
-        tail = pd.read_csv(files[-1]).tail(1)
+        tail = read_chunk(files[-1]).tail(1)
         if len(tail):
             last_open_ms = int(tail["open_time"].iloc[0])
             return datetime.utcfromtimestamp((last_open_ms//1000)+60).replace(tzinfo=timezone.utc)
@@ -87,19 +169,60 @@ def infer_resume_start_from_chunks(prefix):
         pass
     return None
 
-def merge_all(prefix, out_path):
+def write_merged(big, out_path):
+    # .parquet: spaltenweise, typisiert -> Folge-Tools sparen das CSV-Parsen (benoetigt pyarrow)
+    if out_path.endswith(".parquet"):
+        big.to_parquet(out_path, index=False, engine="pyarrow", compression="snappy", row_group_size=100_000)
+    else:
+        big.to_csv(out_path, index=False)
+
+def concat_dedup_sort(dfs):
+    """Wie concat + drop_duplicates(open_time) + sort_values, aber dedupliziert wird vor dem concat:
+    der stabile argsort laeuft nur auf den int64-open_time-Spalten, jeder Chunk wird vorab auf seine
+    Erstvorkommen gefiltert -> der volle Frame entsteht nur einmal, ohne Duplikate."""
+    ots = [d["open_time"].to_numpy() for d in dfs]
+    ot = np.concatenate(ots)
+    if len(ot) < 2 or (ot[1:] > ot[:-1]).all():
+        return pd.concat(dfs, ignore_index=True)
+    order = np.argsort(ot, kind="stable")
+    s = ot[order]
+    first = np.ones(len(s), dtype=bool)
+    first[1:] = s[1:] != s[:-1]
+    idx = order[first]  # Position im concat, sortiert nach open_time
+    keep = np.zeros(len(ot), dtype=bool)
+    keep[idx] = True
+    masks = np.split(keep, np.cumsum([len(o) for o in ots])[:-1])
+    big = pd.concat([d if m.all() else d[m] for d, m in zip(dfs, masks)], ignore_index=True)
+    # Zeile j von big = j-te behaltene Position -> Sortierreihenfolge per searchsorted
+    perm = np.searchsorted(np.flatnonzero(keep), idx)
+    if (perm[1:] > perm[:-1]).all():
+        return big
+    return big.take(perm).reset_index(drop=True)
+
+def merge_all(prefix, out_path, fresh=None, emit_iso=False):
+    """fresh: {chunk_path: DataFrame} aus diesem Lauf -> wird nicht erneut von Platte gelesen.
+    emit_iso: open_time_iso ergaenzen (auch fuer alte Chunks ohne Spalte) bzw. sonst weglassen."""
+    fresh = fresh or {}
     files = existing_chunks(prefix)
     if not files:
         print("WARN: keine Chunks vorhanden zum Mergen."); return
     dfs = []
     for f in files:
-        try: dfs.append(pd.read_csv(f))
+        if f in fresh:
+            dfs.append(fresh[f]); continue
+        try: dfs.append(read_chunk(f))
         except Exception as e: print(f"WARN: Problem beim Lesen {f}: {e}")
     if not dfs: 
         print("WARN: keine lesbaren Chunks."); return
-    big = pd.concat(dfs, ignore_index=True)
-    big = big.drop_duplicates(subset=["open_time"]).sort_values("open_time").reset_index(drop=True)
-    big.to_csv(out_path, index=False)
+    big = concat_dedup_sort(dfs)
+    if not emit_iso:
+        big = big.drop(columns=["open_time_iso"], errors="ignore")
+    elif "open_time_iso" not in big.columns or big["open_time_iso"].isna().any():
+        # Chunks aus Laeufen ohne --emit-iso: fehlende ISO-Strings nachziehen
+        miss = big["open_time_iso"].isna() if "open_time_iso" in big.columns else pd.Series(True, index=big.index)
+        big.loc[miss, "open_time_iso"] = np.asarray(iso_minutes(big.loc[miss, "open_time"]), dtype=object)
+        big.insert(1, "open_time_iso", big.pop("open_time_iso"))
+    write_merged(big, out_path)
     print(f"[OK] Zusammengeführt: {out_path} | Rows={len(big):,}")
 
 def main():
@@ -109,9 +232,16 @@ def main():
     ap.add_argument("--start", required=True, help="z.B. 2017-08-17 oder today")
     ap.add_argument("--end", default="today")
     ap.add_argument("--out", default=None)
+    ap.add_argument("--format", default="csv", choices=["csv","parquet"],
+                    help="Format der zusammengefuehrten Datei (Default-Name bekommt die Endung)")
     ap.add_argument("--chunk-mins", type=int, default=1000)  # max 1000 pro Request
     ap.add_argument("--sleep-sec", type=float, default=0.6)
     ap.add_argument("--max-retries", type=int, default=8)
+    ap.add_argument("--workers", type=int, default=8,
+                    help="parallele Requests; Gesamtrate = workers/sleep-sec pro Sekunde, "
+                         "gedeckelt durch das Weight-Budget des Markts (WEIGHT_BUDGET)")
+    ap.add_argument("--emit-iso", action="store_true",
+                    help="Spalte open_time_iso (UTC-String) mitschreiben; sonst nur open_time in ms")
     args = ap.parse_args()
 
     ensure_dirs()
@@ -121,7 +251,7 @@ def main():
     if end_dt <= start_dt:
         print("ERROR: end <= start"); sys.exit(2)
 
-    out_path = args.out or os.path.join("data", f"{args.symbol.lower()}_1m_{args.market.lower()}.csv")
+    out_path = args.out or os.path.join("data", f"{args.symbol.lower()}_1m_{args.market.lower()}.{args.format}")
     prefix = f"{args.symbol.lower()}_{args.market.lower()}_1m_"
 
     resume_dt = infer_resume_start_from_chunks(prefix)
@@ -129,39 +259,60 @@ def main():
         print(f"[RESUME] Start verschoben auf {resume_dt.isoformat()} (basierend auf vorhandenen Chunks)")
         start_dt = resume_dt
 
-    session = requests.Session()
     LIMIT = min(1000, args.chunk_mins)
+    workers = max(1, args.workers)
+    session = make_session(workers, max_retries=args.max_retries, sleep_sec=args.sleep_sec)
+    limiter = RateLimiter(min_request_interval(args.market, args.sleep_sec, workers))
+
+    # Fenster vorab festlegen: je LIMIT Minuten = max. 1000 Klines = genau ein Request
+    windows = []
     cur = start_dt
-    total_rows = 0
-    req = 0
-    print(f"== Download {args.symbol} 1m ({args.market}) von {start_dt} bis {end_dt} ==")
     while cur < end_dt:
         chunk_end = min(cur + timedelta(minutes=LIMIT), end_dt)
-        start_ms, end_ms = to_ms(cur), to_ms(chunk_end) - 1
+        windows.append((cur, chunk_end))
+        cur = chunk_end
+
+    def fetch_window(win):
+        w_start, w_end = win
         try:
-            kl = fetch_klines(session, endpoint, args.symbol.upper(), start_ms, end_ms,
-                              limit=1000, sleep_sec=args.sleep_sec, max_retries=args.max_retries)
-            if not kl:
-                cur = cur + timedelta(minutes=LIMIT); time.sleep(args.sleep_sec); continue
-            df = klines_to_df(kl)
+            kl = fetch_klines(session, endpoint, args.symbol.upper(), to_ms(w_start), to_ms(w_end) - 1, limit=1000,
+                              limiter=limiter, max_retries=args.max_retries, backoff=args.sleep_sec)
+            return (klines_to_df(kl, emit_iso=args.emit_iso) if kl else None), None
         except Exception as e:
-            print(f"WARN: Fetch-Fehler {e}; skip {cur}..{chunk_end}")
-            cur = cur + timedelta(minutes=LIMIT); time.sleep(args.sleep_sec*2); continue
+            return None, e
+
+    total_rows = 0
+    req = 0
+    fresh = {}  # Chunks dieses Laufs bleiben fuer merge_all im Speicher
+    day_buf = {}  # UTC-Tag -> Teil-DataFrames; eine Chunk-Datei pro Tag statt pro Request
 
-        if df.empty:
-            cur = cur + timedelta(minutes=LIMIT); time.sleep(args.sleep_sec); continue
+    def flush_days(before=None):
+        for day in sorted(d for d in day_buf if before is None or d < before):
+            day_df = pd.concat(day_buf.pop(day), ignore_index=True)
+            fresh[write_chunk(day_df, prefix, args.format)] = day_df
+    print(f"== Download {args.symbol} 1m ({args.market}) von {start_dt} bis {end_dt} | {len(windows)} Requests, workers={workers}, "
+          f"max {1.0 / limiter.min_interval:.1f} req/s ==")
+    # map() liefert in Fenster-Reihenfolge -> Chunk-Dateien entstehen chronologisch (Resume bleibt gueltig)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for (w_start, w_end), (df, err) in zip(windows, pool.map(fetch_window, windows)):
+            if err is not None:
+                print(f"WARN: Fetch-Fehler {err}; skip {w_start}..{w_end}")
+                continue
+            if df is None or df.empty:
+                continue
 
-        first_ts = int(df["open_time"].iloc[0]); last_ts = int(df["open_time"].iloc[-1])
-        fpath = os.path.join("data","raw", f"{prefix}{first_ts}_{last_ts}.csv")
-        df.to_csv(fpath, index=False)
-        total_rows += len(df); req += 1
-        pct = ((cur - start_dt).total_seconds() / (end_dt - start_dt).total_seconds())*100
-        print(f"[{req}] {cur}..{chunk_end} | +{len(df)} rows | total={total_rows:,} | {pct:5.2f}%")
-        # nächster Start = letzte Kline + 60s
-        cur = datetime.utcfromtimestamp((last_ts//1000)+60).replace(tzinfo=timezone.utc)
-        time.sleep(args.sleep_sec)
-
-    merge_all(prefix, out_path)
+            days = df["open_time"] // MS_PER_DAY
+            for day, part in df.groupby(days, sort=True):
+                day_buf.setdefault(day, []).append(part)
+            # Fenster kommen chronologisch -> alle Tage vor dem letzten sind vollstaendig.
+            # Nur abgeschlossene Tage landen auf Platte: Resume setzt nach dem letzten Tag an.
+            flush_days(before=int(days.iloc[-1]))
+            total_rows += len(df); req += 1
+            pct = ((w_end - start_dt).total_seconds() / (end_dt - start_dt).total_seconds())*100
+            print(f"[{req}] {w_start}..{w_end} | +{len(df)} rows | total={total_rows:,} | {pct:5.2f}%")
+
+    flush_days()
+    merge_all(prefix, out_path, fresh, emit_iso=args.emit_iso)
     print("[DONE]")
 
 if __name__ == "__main__":
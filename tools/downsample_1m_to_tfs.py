@@ -15,9 +15,15 @@ Notes:
   - If --drop-incomplete is set, incomplete target candles are removed in output.
 """
 import os, sys, json, argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timezone
 import pandas as pd
-import numpy as np
+
+try:  # optional: multithreaded, typed CSV reader
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = pa_csv = None
 
 AGG_COLS = {
     "open": "first",
@@ -43,12 +49,28 @@ def ensure_out_dir():
     os.makedirs("data", exist_ok=True)
 
 def load_df(path):
-    df = pd.read_csv(path)
-    # ensure open_time integer ms
-    df['open_time'] = df['open_time'].astype('int64')
-    # create datetime index in UTC
-    df['_dt'] = pd.to_datetime(df['open_time'], unit='ms', utc=True)
-    df = df.set_index('_dt', drop=False)
+    # only the columns aggregate_to_tf reads, parsed straight to their dtypes
+    # (number_of_trades as float64: gap-filled rows carry NaN there)
+    cols = ['open_time'] + list(AGG_COLS)
+    if path.endswith('.parquet'):
+        # cached columnar copy (download_binance_1min --format parquet): no CSV parsing at all
+        df = pd.read_parquet(path, columns=cols, engine='pyarrow')
+        df = df.astype({c: 'float64' for c in AGG_COLS})
+    elif pa_csv is not None:
+        types = {c: pa.float64() for c in AGG_COLS}
+        types['open_time'] = pa.int64()
+        table = pa_csv.read_csv(
+            path,
+            read_options=pa_csv.ReadOptions(block_size=16 << 20),
+            convert_options=pa_csv.ConvertOptions(column_types=types, include_columns=cols),
+        )
+        df = table.to_pandas(split_blocks=True, self_destruct=True)
+    else:
+        dtype = dict.fromkeys(AGG_COLS, 'float64')
+        dtype['open_time'] = 'int64'
+        df = pd.read_csv(path, usecols=cols, dtype=dtype, float_precision='round_trip')
+    # datetime index in UTC straight from the int64 ms column
+    df.index = pd.DatetimeIndex(df['open_time'].to_numpy().astype('datetime64[ms]'), tz='UTC', name='_dt')
     return df
 
 def aggregate_to_tf(df, tf, drop_incomplete=False):
@@ -63,94 +85,90 @@ def aggregate_to_tf(df, tf, drop_incomplete=False):
     # resample groups (label left, closed left)
     grp = df.resample(tf, label='left', closed='left')
 
-    # custom aggregations: we need first valid open, last valid close
-    def agg_group(g):
-        if len(g) == 0:
-            return pd.Series({
-                'open_time': pd.NA, 'open_time_iso': pd.NA,
-                'open': pd.NA, 'high': pd.NA, 'low': pd.NA, 'close': pd.NA,
-                'volume': 0.0, 'quote_asset_volume': 0.0,
-                'number_of_trades': 0, 'taker_buy_base_asset_volume': 0.0,
-                'taker_buy_quote_asset_volume': 0.0,
-                'complete': False
-            })
-        # first and last valid
-        open_val = g['open'].dropna()
-        close_val = g['close'].dropna()
-        open_v = open_val.iloc[0] if len(open_val) else np.nan
-        close_v = close_val.iloc[-1] if len(close_val) else np.nan
-        high_v = g['high'].dropna().max() if len(g['high'].dropna()) else np.nan
-        low_v = g['low'].dropna().min() if len(g['low'].dropna()) else np.nan
-        volume_sum = float(g['volume'].fillna(0).sum())
-        quote_sum = float(g['quote_asset_volume'].fillna(0).sum())
-        trades_sum = int(g['number_of_trades'].fillna(0).sum())
-        taker_base = float(g['taker_buy_base_asset_volume'].fillna(0).sum())
-        taker_quote = float(g['taker_buy_quote_asset_volume'].fillna(0).sum())
-        # open_time: first row's open_time (ms) if present else left bin * 1000
-        first_open_time = int(g['open_time'].iloc[0]) if 'open_time' in g.columns and not pd.isna(g['open_time'].iloc[0]) else int(g.index[0].timestamp()*1000)
-        iso = pd.to_datetime(first_open_time, unit='ms', utc=True).strftime("%Y-%m-%dT%H:%M:%SZ")
-        # completeness: require number of rows == expected minutes AND no NaNs in open/high/low/close across the group
-        rows_present = len(g)
-        non_nan_prices = g[['open','high','low','close']].notna().all(axis=1).sum()
-        complete = (rows_present >= minutes) and (non_nan_prices == minutes)
-        return pd.Series({
-            'open_time': int(first_open_time),
-            'open_time_iso': iso,
-            'open': float(open_v) if pd.notna(open_v) else pd.NA,
-            'high': float(high_v) if pd.notna(high_v) else pd.NA,
-            'low': float(low_v) if pd.notna(low_v) else pd.NA,
-            'close': float(close_v) if pd.notna(close_v) else pd.NA,
-            'volume': volume_sum,
-            'quote_asset_volume': quote_sum,
-            'number_of_trades': trades_sum,
-            'taker_buy_base_asset_volume': taker_base,
-            'taker_buy_quote_asset_volume': taker_quote,
-            'complete': bool(complete)
-        })
-
-    out = grp.apply(agg_group)
-    # drop bins that are entirely after last timestamp (may occur)
-    out = out.dropna(subset=['open_time'])
+    # first/last skip NaN -> first valid open, last valid close; sums skip NaN (= fillna(0))
+    out = grp.agg(AGG_COLS)
+    for c in ['open', 'high', 'low', 'close', 'volume', 'quote_asset_volume',
+              'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume']:
+        out[c] = out[c].astype('float64')
+    # open_time: first row's open_time (ms) in the bin
+    out['open_time'] = grp['open_time'].first()
+
+    # completeness: require number of rows == expected minutes AND no NaNs in open/high/low/close across the group
+    rows_present = grp.size()
+    price_ok = df[['open', 'high', 'low', 'close']].notna().all(axis=1)
+    non_nan_prices = price_ok.resample(tf, label='left', closed='left').sum()
+    out['complete'] = (rows_present >= minutes) & (non_nan_prices == minutes)
+
+    # drop empty bins (gaps / after last timestamp)
+    out = out[rows_present.to_numpy() > 0].copy()
+    out['open_time'] = out['open_time'].astype('int64')
+    out['number_of_trades'] = out['number_of_trades'].astype('int64')
+    out['open_time_iso'] = pd.to_datetime(out['open_time'], unit='ms', utc=True).dt.strftime("%Y-%m-%dT%H:%M:%SZ")
     out = out.reset_index(drop=True)
     if drop_incomplete:
         out = out[out['complete']==True].reset_index(drop=True)
     return out
 
+# ensure columns order similar to 1m
+OUT_COLS = ['open_time','open_time_iso','open','high','low','close','volume',
+            'quote_asset_volume','number_of_trades','taker_buy_base_asset_volume','taker_buy_quote_asset_volume','complete']
+
+def aggregate_and_write(infile, tf, drop_incomplete=False, df=None):
+    """Aggregate one tf and write its CSV; df=None -> load infile (worker process)."""
+    if df is None:
+        df = load_df(infile)
+    out_df = aggregate_to_tf(df, tf, drop_incomplete=drop_incomplete)
+    suffix = tf_label_to_suffix(tf)
+    out_name = f"data/btcusdt_{suffix}_spot.csv"
+    out_df = out_df[OUT_COLS]
+    out_df.to_csv(out_name, index=False)
+    num_out = len(out_df)
+    num_complete = int(out_df['complete'].sum())
+    entry = {
+        "tf": tf,
+        "out_file": out_name,
+        "rows": int(num_out),
+        "complete_rows": int(num_complete),
+        "incomplete_rows": int(num_out - num_complete)
+    }
+    return int(len(df)), entry
+
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--in", dest="infile", required=True, help="input 1m CSV (filled)")
+    ap.add_argument("--in", dest="infile", required=True, help="input 1m CSV (filled) or .parquet cache")
     ap.add_argument("--tfs", default="5T,15T,1H", help="comma separated target TFs (pandas offset aliases, e.g. 5T,15T,1H)")
     ap.add_argument("--drop-incomplete", action="store_true", help="drop incomplete target candles")
+    ap.add_argument("--workers", type=int, default=0,
+                    help="parallel processes, one tf each (default: min(#tfs, cpu count); 1 = serial)")
     args = ap.parse_args()
 
     infile = args.infile
     tfs = [t.strip() for t in args.tfs.split(",") if t.strip()]
     drop_incomplete = bool(args.drop_incomplete)
+    workers = args.workers or min(len(tfs), os.cpu_count() or 1)
 
     ensure_out_dir()
-    df = load_df(infile)
-    report = {"infile": infile, "rows_1m": int(len(df)), "outputs": []}
-
+    results = {}
+    if workers > 1 and len(tfs) > 1:
+        # independent CPU-bound aggregations; each worker loads the 1m input itself
+        print(f"[INFO] Aggregating to {','.join(tfs)} with {workers} processes ...")
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            futs = {ex.submit(aggregate_and_write, infile, tf, drop_incomplete): tf for tf in tfs}
+            for fut in as_completed(futs):
+                results[futs[fut]] = fut.result()
+    else:
+        df = load_df(infile)
+        for tf in tfs:
+            print(f"[INFO] Aggregating to {tf} ...")
+            results[tf] = aggregate_and_write(infile, tf, drop_incomplete, df=df)
+
+    # report in --tfs order, independent of completion order
+    rows_1m = results[tfs[0]][0] if tfs else int(len(load_df(infile)))
+    report = {"infile": infile, "rows_1m": rows_1m, "outputs": []}
     for tf in tfs:
-        print(f"[INFO] Aggregating to {tf} ...")
-        out_df = aggregate_to_tf(df, tf, drop_incomplete=drop_incomplete)
-        suffix = tf_label_to_suffix(tf)
-        out_name = f"data/btcusdt_{suffix}_spot.csv"
-        # ensure columns order similar to 1m
-        cols = ['open_time','open_time_iso','open','high','low','close','volume',
-                'quote_asset_volume','number_of_trades','taker_buy_base_asset_volume','taker_buy_quote_asset_volume','complete']
-        out_df = out_df[cols]
-        out_df.to_csv(out_name, index=False)
-        num_out = len(out_df)
-        num_complete = int(out_df['complete'].sum())
-        report["outputs"].append({
-            "tf": tf,
-            "out_file": out_name,
-            "rows": int(num_out),
-            "complete_rows": int(num_complete),
-            "incomplete_rows": int(num_out - num_complete)
-        })
-        print(f" -> wrote {out_name} | rows={num_out} complete={num_complete}")
+        entry = results[tf][1]
+        report["outputs"].append(entry)
+        print(f" -> wrote {entry['out_file']} | rows={entry['rows']} complete={entry['complete_rows']}")
 
     # write report
     report_path = "data/downsample_report.json"
@@ -16,138 +16,159 @@ Outputs:
   - data/fill_report.json               (summary)
   - if fetch used: new chunk files written to data/raw/ and merged
 """
-import os, sys, json, time, argparse
-from datetime import datetime, timezone, timedelta
+import os, sys, json, time, argparse, shutil
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 import numpy as np
 import pandas as pd
-import requests
 
-SPOT_ENDPOINT = "https://api.binance.com/api/v3/klines"
+try:  # optional: multithreaded CSV reader
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = pa_csv = None
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from tools.download_binance_1min import RateLimiter, fetch_klines, klines_to_df, make_session, min_request_interval
 
-def ts_ms_to_iso(ms):
-    return datetime.utcfromtimestamp(int(ms)//1000).replace(tzinfo=timezone.utc).isoformat().replace("+00:00","Z")
+SPOT_ENDPOINT = "https://api.binance.com/api/v3/klines"
 
 def backup_file(path):
     ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
     base = os.path.basename(path)
     out = os.path.join("data", f"{base.replace('.csv','')}_backup_{ts}.csv")
     os.makedirs("data", exist_ok=True)
-    pd.read_csv(path).to_csv(out, index=False)
+    shutil.copy2(path, out)  # byte copy: the input is untouched, no need to parse and re-serialize
     return out
 
+def read_1m_csv(path):
+    """Read the 1m CSV; open_time_iso stays text (pyarrow would parse it as timestamp)."""
+    if pa_csv is None:
+        # round_trip: same exact float parsing as the pyarrow path
+        return pd.read_csv(path, float_precision="round_trip")
+    header = pd.read_csv(path, nrows=0).columns
+    types = {c: pa.string() for c in header if c == "open_time_iso"}
+    opts = pa_csv.ConvertOptions(column_types=types, strings_can_be_null=True)
+    return pa_csv.read_csv(path, convert_options=opts).to_pandas()
+
 def find_gaps(ts_seconds):
-    diffs = ts_seconds[1:] - ts_seconds[:-1]
-    idx = np.where(diffs != 60)[0]
-    gaps = []
-    for i in idx:
-        prev_s = int(ts_seconds[i])
-        curr_s = int(ts_seconds[i+1])
-        gap_min = int((curr_s - prev_s)//60)
-        gaps.append((prev_s, curr_s, gap_min))
-    return gaps
+    """Gaps as int64 arrays (prev_s, curr_s, gap_min): one entry per step != 60s."""
+    ts_seconds = np.asarray(ts_seconds, dtype=np.int64)
+    idx = np.flatnonzero(np.diff(ts_seconds) != 60)
+    prev_s = ts_seconds[idx]
+    curr_s = ts_seconds[idx + 1]
+    return prev_s, curr_s, (curr_s - prev_s) // 60
+
+def dedup_sort_open_time(big):
+    """drop_duplicates(open_time, keep="first") + sort_values in one np.unique on the int64 key
+    (return_index gives the first occurrence of each open_time, in sorted order)."""
+    _, idx = np.unique(big["open_time"].to_numpy(dtype=np.int64), return_index=True)
+    return big.take(idx).reset_index(drop=True)
+
+def empty_column(dtype, n):
+    """All-missing column of length n, typed after the input column instead of n pd.NA objects:
+    float -> NaN float64, int -> nullable Int64 (keeps ints printed as ints), else object."""
+    if pd.api.types.is_float_dtype(dtype):
+        return np.full(n, np.nan)
+    if pd.api.types.is_integer_dtype(dtype):
+        return pd.arrays.IntegerArray(np.zeros(n, dtype=np.int64), np.ones(n, dtype=bool))
+    return np.full(n, pd.NA, dtype=object)
+
+def missing_minutes(open_time_ms):
+    """Missing minute open_times between consecutive rows (sorted, minute-aligned input),
+    enumerated per gap instead of diffing against the full minute range."""
+    ot = np.asarray(open_time_ms, dtype=np.int64)
+    idx = np.flatnonzero(np.diff(ot) > 60000)
+    start = ot[idx] + 60000
+    n = (ot[idx + 1] - start + 59999) // 60000  # minutes strictly before the next row
+    offs = np.arange(int(n.sum()), dtype=np.int64) - np.repeat(np.cumsum(n) - n, n)
+    return np.repeat(start, n) + 60000 * offs
 
 def pad_gaps(df, out_path):
     # assume df sorted by open_time asc
-    first = int(df["open_time"].iloc[0])
-    last  = int(df["open_time"].iloc[-1])
-    full_ms = np.arange(first, last+1, 60000, dtype=np.int64)
-    exist = df["open_time"].astype(np.int64).values
-    missing_ms = np.setdiff1d(full_ms, exist)
+    missing_ms = missing_minutes(df["open_time"].to_numpy(dtype=np.int64))
     print(f"Missing rows to add: {len(missing_ms)}")
     if len(missing_ms)==0:
         df.to_csv(out_path, index=False)
         return {"added":0}
     # build empty frame with same columns
     cols = df.columns.tolist()
-    empty = {c: [pd.NA]*len(missing_ms) for c in cols}
+    empty = {c: empty_column(df[c].dtype, len(missing_ms)) for c in cols}
     empty["open_time"] = missing_ms
-    empty["open_time_iso"] = [ts_ms_to_iso(m) for m in missing_ms]
+    if "open_time_iso" in cols:
+        # vectorized strftime, same format as download_binance_1min.klines_to_df
+        empty["open_time_iso"] = pd.to_datetime(missing_ms, unit="ms", utc=True).strftime("%Y-%m-%dT%H:%M:%SZ")
     miss_df = pd.DataFrame(empty)[cols]
     # concat, sort, dedupe just in case
-    big = pd.concat([df, miss_df], ignore_index=True).drop_duplicates(subset=["open_time"], keep="first")
-    big = big.sort_values("open_time").reset_index(drop=True)
+    big = dedup_sort_open_time(pd.concat([df, miss_df], ignore_index=True))
     big.to_csv(out_path, index=False)
     return {"added": int(len(missing_ms))}
 
-def fetch_klines_for_range(session, symbol, start_ms, end_ms, sleep_sec=0.6, max_retries=8):
+def fetch_klines_for_range(session, symbol, start_ms, end_ms, sleep_sec=0.6, max_retries=8, limiter=None):
+    # limiter: shared RateLimiter when several gaps are fetched in parallel (replaces the fixed sleep);
+    # 429/418 + Retry-After are handled in download_binance_1min.fetch_klines (pauses all workers)
     results = []
     limit = 1000
     cur = start_ms
     while cur < end_ms:
         this_end = min(cur + (limit*60000) - 1, end_ms)
-        params = {"symbol": symbol, "interval": "1m", "startTime": int(cur), "endTime": int(this_end), "limit": limit}
-        for attempt in range(1, max_retries+1):
-            try:
-                r = session.get(SPOT_ENDPOINT, params=params, timeout=30)
-                if r.status_code == 429:
-                    time.sleep(sleep_sec * attempt); continue
-                r.raise_for_status()
-                data = r.json()
-                if not data:
-                    # nothing returned -> break to avoid infinite loop
-                    cur = this_end + 60000
-                    break
-                results.extend(data)
-                last_open = int(data[-1][0])
-                # next minute after last returned
-                cur = (last_open // 1000 + 1) * 1000
-                time.sleep(sleep_sec)
-                break
-            except Exception as e:
-                if attempt >= max_retries:
-                    print("Fetch failed for range", cur, this_end, "err:", e)
-                    cur = this_end + 60000
-                    break
-                time.sleep(sleep_sec * attempt)
+        try:
+            data = fetch_klines(session, SPOT_ENDPOINT, symbol, int(cur), int(this_end), limit=limit,
+                                limiter=limiter, max_retries=max_retries, backoff=sleep_sec)
+        except Exception as e:
+            print("Fetch failed for range", cur, this_end, "err:", e)
+            cur = this_end + 60000
+            continue
+        if not data:
+            # nothing returned -> skip the window to avoid an infinite loop
+            cur = this_end + 60000
+            continue
+        results.extend(data)
+        last_open = int(data[-1][0])
+        # next minute after last returned
+        cur = (last_open // 1000 + 1) * 1000
+        if limiter is None:
+            time.sleep(sleep_sec)
     return results
 
-def klines_to_df(klines):
-    cols = [
-        "open_time","open","high","low","close","volume",
-        "close_time","quote_asset_volume","number_of_trades",
-        "taker_buy_base_asset_volume","taker_buy_quote_asset_volume","ignore"
-    ]
-    df = pd.DataFrame(klines, columns=cols)
-    for c in ["open","high","low","close","volume","quote_asset_volume",
-              "taker_buy_base_asset_volume","taker_buy_quote_asset_volume"]:
-        df[c] = pd.to_numeric(df[c], errors="coerce")
-    for c in ["open_time","close_time","number_of_trades"]:
-        df[c] = pd.to_numeric(df[c], errors="coerce", downcast="integer")
-    df["open_time_iso"] = pd.to_datetime(df["open_time"], unit="ms", utc=True).dt.strftime("%Y-%m-%dT%H:%M:%SZ")
-    df = df.drop(columns=["ignore"])
-    final_cols = [
-        "open_time","open_time_iso","open","high","low","close","volume",
-        "close_time","quote_asset_volume","number_of_trades",
-        "taker_buy_base_asset_volume","taker_buy_quote_asset_volume"
-    ]
-    return df[final_cols]
-
-def fetch_and_insert(df, gaps, symbol):
-    session = requests.Session()
-    fetched_rows = 0
-    new_frames = []
-    for prev_s, curr_s, gap_min in gaps:
-        start_ms = (prev_s + 60) * 1000
-        end_ms   = curr_s * 1000
-        print(f"[FETCH] gap {gap_min}min -> {datetime.utcfromtimestamp(prev_s).isoformat()} .. {datetime.utcfromtimestamp(curr_s).isoformat()}")
-        kl = fetch_klines_for_range(session, symbol, start_ms, end_ms)
-        if kl:
-            kdf = klines_to_df(kl)
-            new_frames.append(kdf)
-            fetched_rows += len(kdf)
-        else:
-            print("  -> no data returned for that gap (will remain)")
-    if new_frames:
-        insert_df = pd.concat(new_frames, ignore_index=True)
-        big = pd.concat([df, insert_df], ignore_index=True).drop_duplicates(subset=["open_time"], keep="first")
-        big = big.sort_values("open_time").reset_index(drop=True)
-        return big, fetched_rows
+def fetch_and_insert(df, gaps, symbol, workers=8, sleep_sec=0.6):
+    # gaps are fetched in parallel over one pooled keep-alive session (make_session: 5xx retries);
+    # the shared limiter keeps the total rate within the spot weight budget and at most workers/sleep_sec
+    workers = max(1, workers)
+    session = make_session(workers, sleep_sec=sleep_sec)
+    limiter = RateLimiter(min_request_interval("spot", sleep_sec, workers))
+    spans = list(zip(*(a.tolist() for a in gaps)))
+
+    def fetch_gap(span):
+        prev_s, curr_s, _ = span
+        return fetch_klines_for_range(session, symbol, (prev_s + 60) * 1000, curr_s * 1000,
+                                      sleep_sec=sleep_sec, limiter=limiter)
+
+    all_klines = []  # raw klines of every gap -> one klines_to_df at the end
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # map() yields in gap order, so the log and all_klines stay chronological
+        for (prev_s, curr_s, gap_min), kl in zip(spans, pool.map(fetch_gap, spans)):
+            print(f"[FETCH] gap {gap_min}min -> {datetime.utcfromtimestamp(prev_s).isoformat()} .. {datetime.utcfromtimestamp(curr_s).isoformat()}")
+            if kl:
+                all_klines.extend(kl)
+            else:
+                print("  -> no data returned for that gap (will remain)")
+    if all_klines:
+        # align to the input schema (e.g. 1m files downloaded without open_time_iso)
+        emit_iso = "open_time_iso" in df.columns
+        insert_df = klines_to_df(all_klines, emit_iso=emit_iso).reindex(columns=df.columns)
+        big = dedup_sort_open_time(pd.concat([df, insert_df], ignore_index=True))
+        return big, len(all_klines)
     return df, 0
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--in", dest="infile", required=True)
     ap.add_argument("--method", choices=["pad","fetch"], default="pad")
+    ap.add_argument("--workers", type=int, default=8, help="parallel gap fetches (--method fetch)")
     args = ap.parse_args()
 
     infile = args.infile
@@ -157,15 +178,17 @@ def main():
     backup = backup_file(infile)
     print("Backup written to", backup)
 
-    df = pd.read_csv(infile)
-    df = df.sort_values("open_time").reset_index(drop=True)
+    df = read_1m_csv(infile)
+    ot = df["open_time"].to_numpy(dtype=np.int64)
+    if not (ot[1:] >= ot[:-1]).all():  # Binance-origin files are already chronological
+        df = df.sort_values("open_time").reset_index(drop=True)
     ts = df["open_time"].astype("int64").values // 1000
     gaps = find_gaps(ts)
     report = {
         "infile": infile,
         "rows_before": int(len(df)),
-        "num_gaps": len(gaps),
-        "largest_gap_min": int(max([g[2] for g in gaps]) if gaps else 0),
+        "num_gaps": int(len(gaps[0])),
+        "largest_gap_min": int(gaps[2].max()) if len(gaps[2]) else 0,
         "method": args.method,
         "added_rows": 0,
         "fetched_rows": 0
@@ -178,10 +201,10 @@ def main():
         report["added_rows"] = int(res.get("added",0))
     else:
         # try to fetch and insert
-        if not gaps:
+        if not len(gaps[0]):
             df.to_csv(out_path, index=False)
         else:
-            big, fetched = fetch_and_insert(df, gaps, symbol="BTCUSDT")
+            big, fetched = fetch_and_insert(df, gaps, symbol="BTCUSDT", workers=args.workers)
             report["fetched_rows"] = int(fetched)
             report["rows_after_fetch"] = int(len(big))
             big.to_csv(out_path, index=False)
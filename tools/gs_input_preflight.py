@@ -31,8 +31,12 @@ import numpy as np
 ALLOWED_SIGNAL_VALUES = {-1, 0, 1}
 
 
+class PreflightError(Exception):
+    """First failed check; the CLI reports it as "[FAIL] <msg>" with exit code 1."""
+
+
 def die(msg: str) -> None:
-    raise SystemExit(f"[FAIL] {msg}")
+    raise PreflightError(msg)
 
 
 def ok(msg: str) -> None:
@@ -142,36 +146,28 @@ def warn_raw_indicator_columns(df: pd.DataFrame, required_signals: List[str]) ->
         info(f"note: raw indicator columns present (ignored by GS): {raw_present}")
 
 
-def main() -> None:
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--csv", required=True, help="CSV path")
-    ap.add_argument("--rows", type=int, default=200000, help="window rows")
-    ap.add_argument("--offset", type=int, default=0, help="window offset")
-    ap.add_argument("--require_signals", default="", help="Comma list of signal base names, e.g. rsi,macd,ma200")
-    ap.add_argument("--regime_cols", default="", help="Comma list of regime columns to validate if present/required")
-    ap.add_argument("--timestamp_col", default="", help="Optional explicit timestamp column to check monotonicity")
-    ap.add_argument("--require_timestamp", action="store_true", help="Fail if no timestamp column can be found")
-    ap.add_argument("--fail_on_all_zero_signals", action="store_true",
-                    help="Fail if any required signal is all zeros in the window")
-    args = ap.parse_args()
-
-    csv_path = args.csv
-    if not os.path.exists(csv_path):
-        # allow relative to repo root in common usage
-        die(f"csv not found: {csv_path}")
-
-    df_all = pd.read_csv(csv_path)
-    df = df_all.iloc[args.offset : args.offset + args.rows].copy()
+def run_preflight(df_all: pd.DataFrame,
+                  csv_path: str,
+                  rows: int = 200000,
+                  offset: int = 0,
+                  require_signals: str = "",
+                  regime_cols: str = "",
+                  timestamp_col: str = "",
+                  require_timestamp: bool = False,
+                  fail_on_all_zero_signals: bool = False) -> None:
+    # Checks on an already parsed CSV (importable, e.g. by gs_run_with_manifest).
+    # Raises PreflightError on the first failed check (no sys.exit in library code).
+    df = df_all.iloc[offset : offset + rows].copy()
 
     info(f"CSV: {csv_path}")
-    info(f"WINDOW: offset={args.offset} rows={len(df)} (requested rows={args.rows})")
+    info(f"WINDOW: offset={offset} rows={len(df)} (requested rows={rows})")
     if len(df) <= 0:
         die("window is empty")
 
     # timestamp check (if available)
-    ts_col = find_timestamp_col(df, args.timestamp_col.strip() or None)
+    ts_col = find_timestamp_col(df, timestamp_col.strip() or None)
     if ts_col is None:
-        if args.require_timestamp:
+        if require_timestamp:
             die("no timestamp column found (require_timestamp is set)")
         info("timestamp: not checked (no timestamp column found)")
     else:
@@ -182,7 +178,7 @@ def main() -> None:
     check_close(df)
 
     # required signals
-    req = split_csv_list(args.require_signals)
+    req = split_csv_list(require_signals)
     if not req:
         info("signals: no --require_signals specified (skipping signal checks)")
     else:
@@ -196,14 +192,14 @@ def main() -> None:
             report_rows.append(
                 f"{col}: n={n} counts(-1/0/1)={counts[-1]}/{counts[0]}/{counts[1]} zero_rate={zrate:.3f}"
             )
-            if args.fail_on_all_zero_signals and zeros == n:
+            if fail_on_all_zero_signals and zeros == n:
                 die(f"{col} is ALL ZERO in window (fail_on_all_zero_signals)")
         ok("signals domain PASS")
         for line in report_rows:
             info(line)
 
     # regime cols (optional required by user)
-    reg_cols = split_csv_list(args.regime_cols)
+    reg_cols = split_csv_list(regime_cols)
     if reg_cols:
         for rc in reg_cols:
             if rc not in df.columns:
@@ -217,5 +213,40 @@ def main() -> None:
     print("[ok] GS INPUT PREFLIGHT: ALL PASS")
 
 
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--csv", required=True, help="CSV path")
+    ap.add_argument("--rows", type=int, default=200000, help="window rows")
+    ap.add_argument("--offset", type=int, default=0, help="window offset")
+    ap.add_argument("--require_signals", default="", help="Comma list of signal base names, e.g. rsi,macd,ma200")
+    ap.add_argument("--regime_cols", default="", help="Comma list of regime columns to validate if present/required")
+    ap.add_argument("--timestamp_col", default="", help="Optional explicit timestamp column to check monotonicity")
+    ap.add_argument("--require_timestamp", action="store_true", help="Fail if no timestamp column can be found")
+    ap.add_argument("--fail_on_all_zero_signals", action="store_true",
+                    help="Fail if any required signal is all zeros in the window")
+    args = ap.parse_args()
+
+    csv_path = args.csv
+    try:
+        if not os.path.exists(csv_path):
+            # allow relative to repo root in common usage
+            die(f"csv not found: {csv_path}")
+
+        df_all = pd.read_csv(csv_path)
+        run_preflight(
+            df_all,
+            csv_path,
+            rows=args.rows,
+            offset=args.offset,
+            require_signals=args.require_signals,
+            regime_cols=args.regime_cols,
+            timestamp_col=args.timestamp_col,
+            require_timestamp=args.require_timestamp,
+            fail_on_all_zero_signals=args.fail_on_all_zero_signals,
+        )
+    except PreflightError as e:
+        raise SystemExit(f"[FAIL] {e}")
+
+
 if __name__ == "__main__":
     main()
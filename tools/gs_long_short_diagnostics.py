@@ -12,22 +12,40 @@
 #       1) Still enforce CONTRACT sanity on DEFAULT params (hard invariant).
 #       2) Run DIAG with overrides and report deltas vs DIAG_DEFAULT.
 #       3) Do NOT compare override run to BASE (GS core uses fixed defaults).
+#   - BATCH MODE (--combs file.json, JSON list of combs):
+#       CSV window is loaded once, every comb runs the checks above, then a
+#       SANITY summary (exit 2 if any comb mismatches). --workers N runs the
+#       combs in N processes; reports are printed in list order.
+#   - GRID MODE (--grid JSON --out_csv path):
+#       Policy sweep over the Cartesian product of the given tp/sl/max_hold/
+#       enter_z/exit_z lists (missing keys: --tp.. overrides or GS defaults).
+#       Score is built once per comb and reused for all grid points; CONTRACT
+#       sanity is still enforced first. One CSV row per (comb, grid point).
 #
 # ASCII-only.
 
 from __future__ import annotations
 
+import io
 import os
 import sys
 import json
 import ast
 import argparse
+import contextlib
+import itertools
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Dict, List, Tuple, Optional
 
 import numpy as np
 import pandas as pd
 
+try:  # optional: JIT for the bar loop in _simulate_diag
+    from numba import njit
+except ImportError:
+    njit = None
+
 
 def repo_root_from_this_file() -> str:
     here = os.path.abspath(os.path.dirname(__file__))
@@ -73,10 +91,10 @@ def _load_csv_window(path: str, rows: int) -> pd.DataFrame:
         path = os.path.join(REPO_ROOT, path)
     if not os.path.isfile(path):
         _fail(f"CSV not found: {path}")
-    df = pd.read_csv(path)
     if rows <= 0:
         _fail("ROWS must be > 0")
-    df = df.iloc[:rows].copy()
+    # only the window and the columns GS/DIAG read (close + *_signal)
+    df = pd.read_csv(path, nrows=rows, usecols=lambda c: c == "close" or c.endswith("_signal"))
     return df
 
 
@@ -123,109 +141,240 @@ def _compute_stats(returns: np.ndarray) -> Tuple[float, float, float, float]:
     return roi, winrate, avg_trade, sharpe
 
 
-def _simulate_diag(
-    df: pd.DataFrame,
-    comb: Dict[str, float],
-    direction: str,
+# exit_code per trade -> reason (kernel output index)
+EXIT_REASONS = ("TP", "SL", "SCORE", "MAXHOLD")
+
+
+def _sim_diag_kernel(
+    score: np.ndarray,
+    close: np.ndarray,
+    entry_idx: np.ndarray,
+    is_long: bool,
     tp: float,
     sl: float,
     max_hold: int,
-    enter_z: float,
     exit_z: float,
-) -> DiagResult:
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    # Bar loop on raw float64 arrays; returns preallocated (returns, hold_bars,
+    # exit_code, num) buffers, only the first num entries are valid.
+    # entry_idx: sorted bars where the entry condition holds. Only those bars
+    # are visited while flat; bars up to the last exit are skipped.
+    # Contract: long exit score < +exit_z ; short exit score > -exit_z
+    n = close.shape[0]
+    m = entry_idx.shape[0]
+    rets = np.empty(m, dtype=np.float64)
+    holds = np.empty(m, dtype=np.int64)
+    codes = np.empty(m, dtype=np.int8)
+    num = 0
+
+    k = 0
+    while k < m:
+        entry_i = entry_idx[k]
+        entry_px = close[entry_i]
+
+        # in position: advance at least 1 bar, evaluate exits at j
+        code = -1
+        r = 0.0
+        hold = 0
+        j = entry_i + 1
+        while j < n:
+            hold = j - entry_i
+            # price return (no fee_internal in DIAG)
+            if is_long:
+                r = (close[j] / entry_px) - 1.0
+                hit_score = score[j] < exit_z
+            else:
+                r = (entry_px / close[j]) - 1.0
+                hit_score = score[j] > -exit_z
+
+            # priority: TP, SL, SCORE, MAXHOLD (match your prior diagnostics behavior)
+            if r >= tp:
+                code = 0
+            elif r <= -sl:
+                code = 1
+            elif hit_score:
+                code = 2
+            elif hold >= max_hold:
+                code = 3
+            if code >= 0:
+                break
+            j += 1
+
+        if code < 0:
+            # still open at the end of the window -> not counted
+            break
+
+        rets[num] = r
+        holds[num] = hold if hold >= 1 else 1
+        codes[num] = code
+        num += 1
+
+        # next entry candidate after the exit bar
+        while k < m and entry_idx[k] <= j:
+            k += 1
+
+    return rets, holds, codes, num
+
+
+def _sim_diag_numpy(
+    score: np.ndarray,
+    close: np.ndarray,
+    entry_idx: np.ndarray,
+    is_long: bool,
+    tp: float,
+    sl: float,
+    max_hold: int,
+    exit_z: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    # Fallback without numba, same contract as _sim_diag_kernel. Most trades
+    # exit within a few bars, so the first bars are walked as scalars (cheaper
+    # than NumPy call overhead). Longer holds continue with vectorized passes
+    # over growing blocks of the max_hold window: first bar with TP|SL|SCORE
+    # via argmax, else MAXHOLD on the last bar.
+    n = close.shape[0]
+    m = entry_idx.shape[0]
+    rets = np.empty(m, dtype=np.float64)
+    holds = np.empty(m, dtype=np.int64)
+    codes = np.empty(m, dtype=np.int8)
+    num = 0
+    # hold >= max_hold is reached at the latest on bar entry_i + span
+    span = max(int(max_hold), 1)
+
+    k = 0
+    while k < m:
+        entry_i = entry_idx[k]
+        entry_px = close[entry_i]
+
+        code = -1
+        r_j = 0.0
+        j = entry_i + 1
+        s_hi = j + 16
+        if s_hi > n:
+            s_hi = n
+        while j < s_hi:
+            if is_long:
+                r_j = (close[j] / entry_px) - 1.0
+                hit_score = score[j] < exit_z
+            else:
+                r_j = (entry_px / close[j]) - 1.0
+                hit_score = score[j] > -exit_z
+            if r_j >= tp:
+                code = 0
+            elif r_j <= -sl:
+                code = 1
+            elif hit_score:
+                code = 2
+            elif j - entry_i >= max_hold:
+                code = 3
+            if code >= 0:
+                break
+            j += 1
+
+        if code < 0 and j < n:
+            end = entry_i + 1 + span
+            hi = min(n, end)
+            b_lo = j
+            block = 64
+            while b_lo < hi:
+                b_hi = min(hi, b_lo + block)
+                if is_long:
+                    r = (close[b_lo:b_hi] / entry_px) - 1.0
+                    hit_score = score[b_lo:b_hi] < exit_z
+                else:
+                    r = (entry_px / close[b_lo:b_hi]) - 1.0
+                    hit_score = score[b_lo:b_hi] > -exit_z
+                hit_tp = r >= tp
+                hit_sl = r <= -sl
+                hit = hit_tp | hit_sl | hit_score
+                if hit.any():
+                    # priority at the exit bar: TP, SL, SCORE
+                    t = int(hit.argmax())
+                    code = 0 if hit_tp[t] else (1 if hit_sl[t] else 2)
+                    j = b_lo + t
+                    r_j = r[t]
+                    break
+                if b_hi == end:
+                    code = 3
+                    j = b_hi - 1
+                    r_j = r[-1]
+                    break
+                b_lo = b_hi
+                block *= 4
+
+        if code < 0:
+            # still open at the end of the window -> not counted
+            break
+
+        rets[num] = r_j
+        holds[num] = j - entry_i
+        codes[num] = code
+        num += 1
+
+        # next entry candidate after the exit bar
+        while k < m and entry_idx[k] <= j:
+            k += 1
+
+    return rets, holds, codes, num
+
+
+# error_model="numpy": x/0.0 -> inf/nan like the NumPy arrays in the fallback
+_sim_diag = (
+    njit(cache=True, error_model="numpy")(_sim_diag_kernel) if njit is not None else _sim_diag_numpy
+)
+
+
+def _diag_score(df: pd.DataFrame, comb: Dict[str, float]) -> np.ndarray:
     # Expect discrete signals in {-1,0,1}. Score = sum(w_i * signal_i).
-    # Entry/Exit as defined in simtraderGS contract comments.
-    d = direction.lower().strip()
-    if d not in ("long", "short"):
-        _fail("direction must be long or short")
+    n = len(df)
 
-    close = df["close"].to_numpy(dtype=float)
-    n = close.size
-
-    # Build score
-    score = np.zeros(n, dtype=float)
-    missing: List[str] = []
-    for k, w in comb.items():
-        col = f"{k}_signal"
-        if col not in df.columns:
-            missing.append(col)
-            continue
-        sig = df[col].to_numpy(dtype=float)
-        score += float(w) * sig
+    # Build score: one (n, k) float64 pull for all signal columns, then
+    # accumulated column by column in comb order. No BLAS GEMV (S @ w): its
+    # summation order differs from simtraderGS and SANITY must match exactly.
+    cols = [f"{k}_signal" for k in comb]
+    missing: List[str] = [c for c in cols if c not in df.columns]
     if missing:
         _fail(f"Missing signal columns: {missing}")
+    weights = np.array([float(w) for w in comb.values()], dtype=np.float64)
+    score = np.zeros(n, dtype=float)
+    if cols:
+        sig = df[cols].to_numpy(dtype=np.float64)
+        for c in range(len(cols)):
+            score += weights[c] * sig[:, c]
+    return score
 
-    # Contract: long entry score > +enter_z ; exit score < +exit_z
-    #           short entry score < -enter_z ; exit score > -exit_z
-    in_pos = False
-    entry_i = -1
-    entry_px = 0.0
-    holds: List[int] = []
-    rets: List[float] = []
-    exit_counts = {"TP": 0, "SL": 0, "SCORE": 0, "MAXHOLD": 0}
-
-    i = 0
-    while i < n:
-        if not in_pos:
-            if d == "long":
-                if score[i] > float(enter_z):
-                    in_pos = True
-                    entry_i = i
-                    entry_px = close[i]
-            else:
-                if score[i] < -float(enter_z):
-                    in_pos = True
-                    entry_i = i
-                    entry_px = close[i]
-            i += 1
-            continue
-
-        # in position: advance at least 1 bar
-        j = i
-        # evaluate exits at j
-        hold = j - entry_i
-        # price return (no fee_internal in DIAG)
-        if d == "long":
-            r = (close[j] / entry_px) - 1.0
-        else:
-            r = (entry_px / close[j]) - 1.0
 
-        # TP/SL thresholds on r
-        hit_tp = r >= float(tp)
-        hit_sl = r <= -float(sl)
+def _diag_entries(score: np.ndarray, d: str, enter_z: float) -> np.ndarray:
+    # Contract: long entry score > +enter_z ; short entry score < -enter_z
+    if d == "long":
+        return np.flatnonzero(score > float(enter_z))
+    return np.flatnonzero(score < -float(enter_z))
 
-        hit_score = False
-        if d == "long":
-            hit_score = score[j] < float(exit_z)
-        else:
-            hit_score = score[j] > -float(exit_z)
-
-        hit_maxhold = hold >= int(max_hold)
-
-        reason = None
-        # priority: TP, SL, SCORE, MAXHOLD (match your prior diagnostics behavior)
-        if hit_tp:
-            reason = "TP"
-        elif hit_sl:
-            reason = "SL"
-        elif hit_score:
-            reason = "SCORE"
-        elif hit_maxhold:
-            reason = "MAXHOLD"
-
-        if reason is not None:
-            exit_counts[reason] = exit_counts.get(reason, 0) + 1
-            holds.append(hold if hold >= 1 else 1)
-            rets.append(float(r))
-            in_pos = False
-            entry_i = -1
-            entry_px = 0.0
-            i = j + 1
-        else:
-            i = j + 1
 
-    returns = np.array(rets, dtype=float)
-    hold_bars = np.array(holds, dtype=int)
+def _diag_run(
+    score: np.ndarray,
+    close: np.ndarray,
+    entry_idx: np.ndarray,
+    d: str,
+    tp: float,
+    sl: float,
+    max_hold: int,
+    exit_z: float,
+) -> DiagResult:
+    rets, holds, codes, num = _sim_diag(
+        score,
+        close,
+        entry_idx,
+        d == "long",
+        float(tp),
+        float(sl),
+        int(max_hold),
+        float(exit_z),
+    )
+    counts = np.bincount(codes[:num], minlength=len(EXIT_REASONS))
+    exit_counts = {k: int(c) for k, c in zip(EXIT_REASONS, counts)}
+
+    returns = rets[:num]
+    hold_bars = holds[:num]
     roi, winrate, avg_trade, sharpe = _compute_stats(returns)
 
     return DiagResult(
@@ -241,86 +390,162 @@ def _simulate_diag(
     )
 
 
+def _simulate_diag(
+    df: pd.DataFrame,
+    comb: Dict[str, float],
+    direction: str,
+    tp: float,
+    sl: float,
+    max_hold: int,
+    enter_z: float,
+    exit_z: float,
+) -> DiagResult:
+    # Entry/Exit as defined in simtraderGS contract comments.
+    d = direction.lower().strip()
+    if d not in ("long", "short"):
+        _fail("direction must be long or short")
+
+    close = df["close"].to_numpy(dtype=float)
+    score = _diag_score(df, comb)
+    entry_idx = _diag_entries(score, d, enter_z)
+    return _diag_run(score, close, entry_idx, d, tp, sl, max_hold, exit_z)
+
+
 def _print_diag_block(title: str, dr: DiagResult, fee: float) -> None:
-    print(title)
-    print(f"  roi: {dr.roi}")
-    print(f"  num_trades: {dr.num_trades}")
-    print(f"  winrate: {dr.winrate}")
-    print(f"  sharpe: {dr.sharpe}")
-    print(f"  pnl_sum: {dr.pnl_sum}")
-    print(f"  avg_trade: {dr.avg_trade}")
+    # block is assembled first and emitted with a single stdout write
+    parts: List[str] = [f"{title}\n"]
+    parts.append(f"  roi: {dr.roi}\n")
+    parts.append(f"  num_trades: {dr.num_trades}\n")
+    parts.append(f"  winrate: {dr.winrate}\n")
+    parts.append(f"  sharpe: {dr.sharpe}\n")
+    parts.append(f"  pnl_sum: {dr.pnl_sum}\n")
+    parts.append(f"  avg_trade: {dr.avg_trade}\n")
     roi_fee = dr.roi - float(fee) * int(dr.num_trades)
-    print(f"  roi_fee(external): {roi_fee}")
-    print("")
-    print("EXIT COUNTS:")
+    parts.append(f"  roi_fee(external): {roi_fee}\n")
+    parts.append("\n")
+    parts.append("EXIT COUNTS:\n")
     total = max(1, dr.num_trades)
-    for k in ["TP", "SL", "SCORE", "MAXHOLD"]:
+    for k in EXIT_REASONS:
         c = int(dr.exit_counts.get(k, 0))
-        print(f"  {k:7}: {c:6d} ({c/total:.3f})")
-    print("HOLD BARS:")
+        parts.append(f"  {k:7}: {c:6d} ({c/total:.3f})\n")
+    parts.append("HOLD BARS:\n")
     if dr.num_trades == 0:
-        print("  (no trades)")
+        parts.append("  (no trades)\n")
     else:
         hb = dr.hold_bars
-        print(f"  min={int(np.min(hb))} med={float(np.median(hb))} mean={float(np.mean(hb)):.2f} max={int(np.max(hb))}")
-    print("")
+        parts.append(f"  min={int(np.min(hb))} med={float(np.median(hb))} mean={float(np.mean(hb)):.2f} max={int(np.max(hb))}\n")
+    parts.append("\n")
+    sys.stdout.write("".join(parts))
 
 
-def main() -> int:
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--csv", required=True)
-    ap.add_argument("--rows", type=int, default=20000)
-    ap.add_argument("--direction", required=True, choices=["long", "short"])
-    ap.add_argument("--fee", type=float, default=0.0004)
-    ap.add_argument("--comb", type=str, default="")
-    # override knobs (POLICY MODE when any differs from GS defaults)
-    ap.add_argument("--tp", type=float, default=None)
-    ap.add_argument("--sl", type=float, default=None)
-    ap.add_argument("--max_hold", type=int, default=None)
-    ap.add_argument("--enter_z", type=float, default=None)
-    ap.add_argument("--exit_z", type=float, default=None)
+def _load_combs(path: str) -> List[Dict[str, float]]:
+    # JSON list of combs; items are dicts or dict-like strings (as for --comb)
+    if not os.path.isabs(path):
+        path = os.path.join(REPO_ROOT, path)
+    if not os.path.isfile(path):
+        _fail(f"COMBS file not found: {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            items = json.load(f)
+        except Exception as e:
+            _fail(f"COMBS is not valid JSON: {e}")
+    if not isinstance(items, list) or not items:
+        _fail("COMBS must be a non-empty JSON list.")
+    combs: List[Dict[str, float]] = []
+    for i, it in enumerate(items, start=1):
+        if not isinstance(it, (dict, str)):
+            _fail(f"COMBS item {i}: expected dict or dict-like string, got {type(it).__name__}")
+        text = json.dumps(it) if isinstance(it, dict) else it.strip()
+        # empty items would silently become the --comb default
+        if not it or not text:
+            _fail(f"COMBS item {i}: empty comb")
+        try:
+            combs.append(_parse_comb(text))
+        except (ValueError, SyntaxError) as e:
+            _fail(f"COMBS item {i}: cannot parse {text!r}: {e}")
+    return combs
 
-    args = ap.parse_args()
 
-    comb = _parse_comb(args.comb)
+GRID_KEYS = ("tp", "sl", "max_hold", "enter_z", "exit_z")
 
-    print(f"REPO_ROOT: {REPO_ROOT}")
-    print(f"CSV: {args.csv}")
-    print(f"ROWS: {args.rows}")
-    print(f"COMB: {comb}")
+
+def _load_grid(text: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # --grid: JSON object (inline or path to .json) of key -> list of values;
+    # keys not given stay at params. Points in fixed GRID_KEYS order.
+    text = (text or "").strip()
+    path = text if os.path.isabs(text) else os.path.join(REPO_ROOT, text)
+    if not text.startswith("{") and os.path.isfile(path):
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+    try:
+        obj = json.loads(text)
+    except Exception as e:
+        _fail(f"GRID is not valid JSON: {e}")
+    if not isinstance(obj, dict) or not obj:
+        _fail("GRID must be a non-empty JSON object.")
+    unknown = sorted(set(obj) - set(GRID_KEYS))
+    if unknown:
+        _fail(f"GRID: unknown keys {unknown} (allowed: {list(GRID_KEYS)})")
+    axes: List[List[Any]] = []
+    for k in GRID_KEYS:
+        vals = obj.get(k, [params[k]])
+        if not isinstance(vals, list):
+            vals = [vals]
+        if not vals:
+            _fail(f"GRID: empty value list for {k}")
+        if any(isinstance(v, bool) or not isinstance(v, (int, float)) for v in vals):
+            _fail(f"GRID: {k} values must be numbers, got {vals}")
+        if k == "max_hold":
+            # no silent truncation (10.7 -> 10)
+            bad = [v for v in vals if isinstance(v, float) and not v.is_integer()]
+            if bad:
+                _fail(f"GRID: max_hold values must be integers, got {bad}")
+            axes.append([int(v) for v in vals])
+        else:
+            axes.append([float(v) for v in vals])
+    return [dict(zip(GRID_KEYS, pt)) for pt in itertools.product(*axes)]
+
+
+def _print_sanity(base: Dict[str, Any], diag_default: DiagResult) -> bool:
+    # SANITY must match BASE exactly (roi + trades) for default params
+    sanity_ok = (abs(diag_default.roi - float(base.get("roi", 0.0))) == 0.0) and (diag_default.num_trades == int(base.get("num_trades", -1)))
+    print("SANITY (fee=0): DIAG_DEFAULT vs BASE match:", "True" if sanity_ok else "False")
+    print(f"  BASE roi={float(base.get('roi', 0.0)):.12f} trades={int(base.get('num_trades', 0))}")
+    print(f"  DIAG roi={diag_default.roi:.12f} trades={diag_default.num_trades}")
     print("")
+    return sanity_ok
 
-    df = _load_csv_window(args.csv, args.rows)
+
+def _run_comb(
+    df: pd.DataFrame,
+    comb: Dict[str, float],
+    direction: str,
+    fee: float,
+    defaults: Dict[str, Any],
+    params: Dict[str, Any],
+) -> int:
+    # BASE + DIAG_DEFAULT (+ DIAG_POLICY) for one comb; 0 = ok, 2 = SANITY mismatch
+    tp = params["tp"]
+    sl = params["sl"]
+    max_hold = params["max_hold"]
+    enter_z = params["enter_z"]
+    exit_z = params["exit_z"]
 
     # BASE always uses GS core defaults. Fee forced to 0 in GS already (per your tool behavior).
-    base = evaluate_strategy(df, comb, args.direction)
+    base = evaluate_strategy(df, comb, direction)
 
     print("BASE (simtraderGS, fee forced to 0):")
     for k in ["roi", "num_trades", "winrate", "sharpe", "pnl_sum", "avg_trade"]:
         if k in base:
             print(f"  {k}: {base[k]}")
-    roi_fee_base = float(base.get("roi", 0.0)) - float(args.fee) * int(base.get("num_trades", 0))
+    roi_fee_base = float(base.get("roi", 0.0)) - float(fee) * int(base.get("num_trades", 0))
     print(f"  roi_fee(external): {roi_fee_base}")
     print("")
 
-    defaults = _get_gs_defaults()
-    # resolve overrides -> policy params
-    tp = defaults["tp"] if args.tp is None else float(args.tp)
-    sl = defaults["sl"] if args.sl is None else float(args.sl)
-    max_hold = defaults["max_hold"] if args.max_hold is None else int(args.max_hold)
-    enter_z = defaults["enter_z"] if args.enter_z is None else float(args.enter_z)
-    exit_z = defaults["exit_z"] if args.exit_z is None else float(args.exit_z)
-
-    policy_mode = (
-        (tp != defaults["tp"])
-        or (sl != defaults["sl"])
-        or (max_hold != defaults["max_hold"])
-        or (enter_z != defaults["enter_z"])
-        or (exit_z != defaults["exit_z"])
-    )
+    policy_mode = any(params[k] != defaults[k] for k in ("tp", "sl", "max_hold", "enter_z", "exit_z"))
 
     print("============================================================")
-    print(f"DIRECTION: {args.direction.upper()}")
+    print(f"DIRECTION: {direction.upper()}")
     print(f"GS DEFAULTS: tp={defaults['tp']} sl={defaults['sl']} max_hold={defaults['max_hold']} enter_z={defaults['enter_z']} exit_z={defaults['exit_z']}")
     print(f"DIAG PARAMS : tp={tp} sl={sl} max_hold={max_hold} enter_z={enter_z} exit_z={exit_z}")
     print("MODE       :", "POLICY (override)" if policy_mode else "CONTRACT (default)")
@@ -331,7 +556,7 @@ def main() -> int:
     diag_default = _simulate_diag(
         df=df,
         comb=comb,
-        direction=args.direction,
+        direction=direction,
         tp=defaults["tp"],
         sl=defaults["sl"],
         max_hold=defaults["max_hold"],
@@ -339,18 +564,13 @@ def main() -> int:
         exit_z=defaults["exit_z"],
     )
 
-    # SANITY must match BASE exactly (roi + trades) for default params
-    sanity_ok = (abs(diag_default.roi - float(base.get("roi", 0.0))) == 0.0) and (diag_default.num_trades == int(base.get("num_trades", -1)))
-    print("SANITY (fee=0): DIAG_DEFAULT vs BASE match:", "True" if sanity_ok else "False")
-    print(f"  BASE roi={float(base.get('roi', 0.0)):.12f} trades={int(base.get('num_trades', 0))}")
-    print(f"  DIAG roi={diag_default.roi:.12f} trades={diag_default.num_trades}")
-    print("")
+    sanity_ok = _print_sanity(base, diag_default)
 
     if not sanity_ok:
         print("ERROR: Contract mismatch in DEFAULT mode. This should not happen.")
         return 2
 
-    _print_diag_block("DIAG_DEFAULT (contract)", diag_default, args.fee)
+    _print_diag_block("DIAG_DEFAULT (contract)", diag_default, fee)
 
     # If no overrides, we are done (contract verified + detailed stats)
     if not policy_mode:
@@ -361,7 +581,7 @@ def main() -> int:
     diag_policy = _simulate_diag(
         df=df,
         comb=comb,
-        direction=args.direction,
+        direction=direction,
         tp=tp,
         sl=sl,
         max_hold=max_hold,
@@ -369,14 +589,14 @@ def main() -> int:
         exit_z=exit_z,
     )
 
-    _print_diag_block("DIAG_POLICY (override)", diag_policy, args.fee)
+    _print_diag_block("DIAG_POLICY (override)", diag_policy, fee)
 
     # Report deltas
     print("DELTA (POLICY - DEFAULT):")
     print(f"  trades: {diag_policy.num_trades - diag_default.num_trades:+d} (policy={diag_policy.num_trades} default={diag_default.num_trades})")
     print(f"  roi   : {diag_policy.roi - diag_default.roi:+.6f} (policy={diag_policy.roi:.6f} default={diag_default.roi:.6f})")
-    roi_fee_def = diag_default.roi - float(args.fee) * diag_default.num_trades
-    roi_fee_pol = diag_policy.roi - float(args.fee) * diag_policy.num_trades
+    roi_fee_def = diag_default.roi - float(fee) * diag_default.num_trades
+    roi_fee_pol = diag_policy.roi - float(fee) * diag_policy.num_trades
     print(f"  roi_fee(external): {roi_fee_pol - roi_fee_def:+.6f} (policy={roi_fee_pol:.6f} default={roi_fee_def:.6f})")
     if diag_default.num_trades > 0 and diag_policy.num_trades > 0:
         print(f"  hold mean: {float(np.mean(diag_policy.hold_bars)) - float(np.mean(diag_default.hold_bars)):+.2f}")
@@ -387,6 +607,218 @@ def main() -> int:
     return 0
 
 
+def _run_grid(
+    df: pd.DataFrame,
+    comb: Dict[str, float],
+    direction: str,
+    fee: float,
+    defaults: Dict[str, Any],
+    grid: List[Dict[str, Any]],
+    rows_out: List[Dict[str, Any]],
+) -> int:
+    # CONTRACT sanity, then all grid points on one score; rows appended to rows_out
+    base = evaluate_strategy(df, comb, direction)
+    d = direction.lower().strip()
+    close = df["close"].to_numpy(dtype=float)
+    score = _diag_score(df, comb)
+
+    diag_default = _diag_run(
+        score,
+        close,
+        _diag_entries(score, d, defaults["enter_z"]),
+        d,
+        defaults["tp"],
+        defaults["sl"],
+        defaults["max_hold"],
+        defaults["exit_z"],
+    )
+    if not _print_sanity(base, diag_default):
+        print("ERROR: Contract mismatch in DEFAULT mode. Grid skipped for this comb.")
+        return 2
+
+    # entry bars depend on enter_z only
+    entries: Dict[float, np.ndarray] = {}
+    comb_txt = json.dumps(comb, sort_keys=True)
+    best: Optional[Dict[str, Any]] = None
+    for pt in grid:
+        ez = pt["enter_z"]
+        if ez not in entries:
+            entries[ez] = _diag_entries(score, d, ez)
+        dr = _diag_run(score, close, entries[ez], d, pt["tp"], pt["sl"], pt["max_hold"], pt["exit_z"])
+        row: Dict[str, Any] = {"comb": comb_txt, "direction": d}
+        row.update(pt)
+        row.update(
+            {
+                "num_trades": dr.num_trades,
+                "roi": dr.roi,
+                "roi_fee": dr.roi - float(fee) * dr.num_trades,
+                "winrate": dr.winrate,
+                "sharpe": dr.sharpe,
+                "avg_trade": dr.avg_trade,
+                "hold_mean": float(np.mean(dr.hold_bars)) if dr.num_trades else 0.0,
+            }
+        )
+        for k in EXIT_REASONS:
+            row[f"exit_{k}"] = int(dr.exit_counts.get(k, 0))
+        rows_out.append(row)
+        if best is None or row["roi_fee"] > best["roi_fee"]:
+            best = row
+
+    print(f"GRID: {len(grid)} points")
+    if best is not None:
+        bp = " ".join(f"{k}={best[k]}" for k in GRID_KEYS)
+        print(f"  best roi_fee(external)={best['roi_fee']:.6f} trades={best['num_trades']} @ {bp}")
+    print("")
+    return 0
+
+
+# per-process CSV window for parallel --combs (pre-seeded by main, inherited on fork)
+_WORKER_DF: Dict[Tuple[str, int], pd.DataFrame] = {}
+
+
+def _run_comb_captured(
+    csv_path: str,
+    rows: int,
+    comb: Dict[str, float],
+    direction: str,
+    fee: float,
+    defaults: Dict[str, Any],
+    params: Dict[str, Any],
+) -> Tuple[int, str]:
+    # worker entry for parallel --combs: report is captured and returned as text
+    key = (csv_path, rows)
+    df = _WORKER_DF.get(key)
+    if df is None:
+        df = _load_csv_window(csv_path, rows)
+        _WORKER_DF[key] = df
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        rc = _run_comb(df, comb, direction, fee, defaults, params)
+    return rc, buf.getvalue()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--csv", required=True)
+    ap.add_argument("--rows", type=int, default=20000)
+    ap.add_argument("--direction", required=True, choices=["long", "short"])
+    ap.add_argument("--fee", type=float, default=0.0004)
+    ap.add_argument("--comb", type=str, default="")
+    # batch mode: JSON list of combs, evaluated on one loaded CSV window
+    ap.add_argument("--combs", type=str, default="")
+    ap.add_argument("--workers", type=int, default=0,
+                    help="parallel processes for --combs (default: min(#combs, cpu count); 1 = serial)")
+    # override knobs (POLICY MODE when any differs from GS defaults)
+    ap.add_argument("--tp", type=float, default=None)
+    ap.add_argument("--sl", type=float, default=None)
+    ap.add_argument("--max_hold", type=int, default=None)
+    ap.add_argument("--enter_z", type=float, default=None)
+    ap.add_argument("--exit_z", type=float, default=None)
+    # grid mode: policy sweep, results to one CSV (see header)
+    ap.add_argument("--grid", type=str, default="",
+                    help='JSON object or .json path, e.g. {"tp":[0.02,0.04],"enter_z":[0.8,1.0]}')
+    ap.add_argument("--out_csv", type=str, default="", help="Output CSV for --grid")
+
+    args = ap.parse_args()
+
+    if args.combs and args.comb:
+        _fail("Use either --comb or --combs, not both.")
+    if bool(args.grid) != bool(args.out_csv):
+        _fail("--grid and --out_csv must be given together.")
+    combs = _load_combs(args.combs) if args.combs else [_parse_comb(args.comb)]
+
+    print(f"REPO_ROOT: {REPO_ROOT}")
+    print(f"CSV: {args.csv}")
+    print(f"ROWS: {args.rows}")
+    if args.combs:
+        print(f"COMBS: {args.combs} ({len(combs)})")
+    else:
+        print(f"COMB: {combs[0]}")
+    print("")
+
+    # loaded once; GS caches its signal prep per DataFrame, so batch runs reuse it
+    df = _load_csv_window(args.csv, args.rows)
+
+    defaults = _get_gs_defaults()
+    # resolve overrides -> policy params
+    params = {
+        "tp": defaults["tp"] if args.tp is None else float(args.tp),
+        "sl": defaults["sl"] if args.sl is None else float(args.sl),
+        "max_hold": defaults["max_hold"] if args.max_hold is None else int(args.max_hold),
+        "enter_z": defaults["enter_z"] if args.enter_z is None else float(args.enter_z),
+        "exit_z": defaults["exit_z"] if args.exit_z is None else float(args.exit_z),
+    }
+
+    if args.grid:
+        grid = _load_grid(args.grid, params)
+        out_csv = args.out_csv if os.path.isabs(args.out_csv) else os.path.join(REPO_ROOT, args.out_csv)
+        print(f"GRID: {len(grid)} points x {len(combs)} comb(s) -> {out_csv}")
+        print("")
+        rows_out: List[Dict[str, Any]] = []
+        failed_grid: List[int] = []
+        for i, comb in enumerate(combs, start=1):
+            print("############################################################")
+            print(f"COMB [{i}/{len(combs)}]: {comb}")
+            print("")
+            if _run_grid(df, comb, args.direction, args.fee, defaults, grid, rows_out) != 0:
+                failed_grid.append(i)
+        out_dir = os.path.dirname(out_csv)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        pd.DataFrame(rows_out).to_csv(out_csv, index=False)
+        print(f"[OK] wrote {len(rows_out)} rows: {out_csv}")
+        if failed_grid:
+            print(f"  SANITY mismatch (skipped): {failed_grid}")
+            return 2
+        return 0
+
+    if not args.combs:
+        return _run_comb(df, combs[0], args.direction, args.fee, defaults, params)
+
+    workers = args.workers or min(len(combs), os.cpu_count() or 1)
+    failed: List[int] = []
+    if workers > 1 and len(combs) > 1:
+        # independent, deterministic per-comb runs (GS keeps module state, so
+        # processes, not threads); map() yields results in --combs order
+        _WORKER_DF[(args.csv, args.rows)] = df
+        n = len(combs)
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            results = ex.map(
+                _run_comb_captured,
+                [args.csv] * n,
+                [args.rows] * n,
+                combs,
+                [args.direction] * n,
+                [args.fee] * n,
+                [defaults] * n,
+                [params] * n,
+            )
+            for i, (comb, (rc, text)) in enumerate(zip(combs, results), start=1):
+                print("############################################################")
+                print(f"COMB [{i}/{len(combs)}]: {comb}")
+                print("")
+                sys.stdout.write(text)
+                if rc != 0:
+                    failed.append(i)
+                print("")
+    else:
+        for i, comb in enumerate(combs, start=1):
+            print("############################################################")
+            print(f"COMB [{i}/{len(combs)}]: {comb}")
+            print("")
+            if _run_comb(df, comb, args.direction, args.fee, defaults, params) != 0:
+                failed.append(i)
+            print("")
+
+    print("BATCH SUMMARY:")
+    print(f"  combs: {len(combs)}")
+    print(f"  SANITY ok: {len(combs) - len(failed)}/{len(combs)}")
+    if failed:
+        print(f"  SANITY mismatch: {failed}")
+        return 2
+    return 0
+
+
 if __name__ == "__main__":
     sys.exit(main())
 
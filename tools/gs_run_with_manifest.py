@@ -4,7 +4,7 @@
 # Purpose:
 #   One-shot GS runner that:
 #     1) writes a run manifest to results/GS/meta/
-#     2) runs GS input preflight (tools/gs_input_preflight.py)
+#     2) runs GS input preflight (tools/gs_input_preflight.py, in-process on the parsed CSV)
 #     3) runs exactly one evaluation via engine/simtraderGS.py
 #     4) writes eval JSON to results/GS/meta/
 #
@@ -35,6 +35,9 @@ from typing import Any, Dict, Optional, Tuple
 import pandas as pd
 import numpy as np
 
+# non-signal columns read from the price csv (eval + gates; preflight adds its own)
+PRICE_COLS = ("close", "allow_long", "allow_short")
+
 
 # ---------------------------
 # helpers
@@ -63,8 +66,11 @@ def ensure_repo_root() -> Path:
 
 
 def sha256_file(p: Path) -> str:
-    h = hashlib.sha256()
     with p.open("rb") as f:
+        # Python 3.11+: hashlib reads the fd itself (no per-chunk Python loop)
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
         for chunk in iter(lambda: f.read(1024 * 1024), b""):
             h.update(chunk)
     return h.hexdigest()
@@ -119,26 +125,6 @@ def ensure_outdir(repo_root: Path) -> Path:
     return outdir
 
 
-def preflight_cmd(repo_root: Path,
-                  price_csv: str,
-                  rows: int,
-                  offset: int,
-                  timestamp_col: str,
-                  require_signals: str,
-                  fail_on_all_zero: bool) -> list:
-    cmd = [
-        sys.executable, "tools/gs_input_preflight.py",
-        "--csv", price_csv,
-        "--rows", str(rows),
-        "--offset", str(offset),
-        "--timestamp_col", timestamp_col,
-        "--require_signals", require_signals,
-    ]
-    if fail_on_all_zero:
-        cmd.append("--fail_on_all_zero_signals")
-    return cmd
-
-
 def compute_gate_stats(df: pd.DataFrame, gate_col: str, rows: int) -> Dict[str, Any]:
     if gate_col not in df.columns:
         return {"present": False, "rows_checked": int(rows), "ones": 0, "allow_rate": 0.0}
@@ -188,6 +174,16 @@ def import_simtraderGS(repo_root: Path):
         die(f"could not import engine.simtraderGS: {e}")
 
 
+def import_preflight(repo_root: Path):
+    if str(repo_root) not in sys.path:
+        sys.path.insert(0, str(repo_root))
+    try:
+        from tools import gs_input_preflight  # type: ignore
+        return gs_input_preflight
+    except Exception as e:
+        die(f"could not import tools.gs_input_preflight: {e}")
+
+
 def eval_one(simtraderGS,
              df: pd.DataFrame,
              comb: Dict[str, float],
@@ -331,15 +327,6 @@ def main() -> int:
     if not price_csv:
         die("--price-csv empty")
 
-    # Read price csv
-    try:
-        df = pd.read_csv(price_csv)
-    except Exception as e:
-        die(f"could not read price csv: {price_csv}. err={e}")
-
-    # Determine effective gate mode
-    gate_eff = pick_gate_mode(args.gate, args.direction, df)
-
     # Preflight requires signals list from comb keys (base names)
     # We pass base names that look like "rsi" "macd" "ma200" etc.
     # If user provided *_signal keys, we strip suffix for preflight.
@@ -351,6 +338,18 @@ def main() -> int:
         req.append(kk)
     require_signals = ",".join(sorted(set(req)))
 
+    # Read price csv once: only what eval, gate stats and preflight consume
+    # (close, *_signal, gate cols, timestamp, raw cols named in comb).
+    # Default C parser on purpose: same float parse as simtraderGS/other GS tools.
+    keep = set(PRICE_COLS) | {args.timestamp_col} | set(req)
+    try:
+        df = pd.read_csv(price_csv, usecols=lambda c: c in keep or c.endswith("_signal"))
+    except Exception as e:
+        die(f"could not read price csv: {price_csv}. err={e}")
+
+    # Determine effective gate mode
+    gate_eff = pick_gate_mode(args.gate, args.direction, df)
+
     # Manifest
     run_ts = utc_now_compact()
     manifest_path = outdir / f"run_manifest_{run_ts}.json"
@@ -407,20 +406,23 @@ def main() -> int:
     manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
     print(f"[ok] wrote manifest: {manifest_path}")
 
-    # Run preflight (subprocess)
-    cmd = preflight_cmd(
-        repo_root=repo_root,
-        price_csv=price_csv,
-        rows=rows,
-        offset=off,
-        timestamp_col=args.timestamp_col,
-        require_signals=require_signals,
-        fail_on_all_zero=bool(args.fail_on_all_zero_signals),
-    )
-    print("[info] preflight: " + " ".join(cmd))
-    rc = subprocess.call(cmd, cwd=str(repo_root))
-    if rc != 0:
-        die(f"preflight failed rc={rc}", code=rc)
+    # Run preflight (in-process on the parsed csv; no second read)
+    preflight = import_preflight(repo_root)
+    print("[info] preflight: in-process tools/gs_input_preflight.py")
+    try:
+        preflight.run_preflight(
+            df,
+            price_csv,
+            rows=rows,
+            offset=off,
+            require_signals=require_signals,
+            timestamp_col=args.timestamp_col,
+            fail_on_all_zero_signals=bool(args.fail_on_all_zero_signals),
+        )
+    except preflight.PreflightError as e:
+        # same stderr + rc as the preflight CLI
+        print(f"[FAIL] {e}", file=sys.stderr)
+        die("preflight failed rc=1", code=1)
 
     # Run evaluation
     simtraderGS = import_simtraderGS(repo_root)
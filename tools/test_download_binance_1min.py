@@ -0,0 +1,143 @@
+# tools/test_download_binance_1min.py
+#
+# Unit tests for the frame helpers in download_binance_1min.py (no network).
+# ASCII-only.
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from tools.download_binance_1min import KLINE_FIELDS, concat_dedup_sort, klines_to_df, merge_all, write_chunk
+
+
+def make_kline(open_time_ms, close=100.0):
+    # Binance layout: 12 fields, index 11 ("ignore") is dropped by klines_to_df
+    return [open_time_ms, "99.5", "101.0", "99.0", str(close), "12.5",
+            open_time_ms + 59_999, "1250.0", 42, "6.0", "600.0", "0"]
+
+
+class KlinesToDfTests(unittest.TestCase):
+    def test_typed_columns(self):
+        df = klines_to_df([make_kline(0), make_kline(60_000, close=100.25)])
+        self.assertEqual(list(df.columns), [name for _, name, _ in KLINE_FIELDS])
+        for _, name, dt in KLINE_FIELDS:
+            self.assertEqual(df[name].dtype, np.dtype(dt), name)
+        self.assertEqual(df["close"].tolist(), [100.0, 100.25])
+
+    def test_emit_iso(self):
+        df = klines_to_df([make_kline(60_000)], emit_iso=True)
+        self.assertEqual(df.columns[1], "open_time_iso")
+        self.assertEqual(df["open_time_iso"].tolist(), ["1970-01-01T00:01:00Z"])
+
+    def test_empty_klines_give_empty_typed_frame(self):
+        # Binance answers a range without data with []
+        for emit_iso in (False, True):
+            df = klines_to_df([], emit_iso=emit_iso)
+            self.assertEqual(len(df), 0)
+            self.assertEqual("open_time_iso" in df.columns, emit_iso)
+            for _, name, dt in KLINE_FIELDS:
+                self.assertEqual(df[name].dtype, np.dtype(dt), name)
+
+
+def frame(open_times, close, emit_iso=False):
+    return klines_to_df([make_kline(int(t), close=c) for t, c in zip(open_times, close)], emit_iso=emit_iso)
+
+
+def old_pipeline(dfs):
+    # merge before the rewrite: concat + drop_duplicates(open_time) + sort_values
+    big = pd.concat(dfs, ignore_index=True)
+    return big.drop_duplicates(subset=["open_time"]).sort_values("open_time").reset_index(drop=True)
+
+
+class ConcatDedupSortTests(unittest.TestCase):
+    def test_sorted_chunks_pass_through(self):
+        dfs = [frame([0, 60_000], [1.0, 2.0]), frame([120_000], [3.0])]
+        big = concat_dedup_sort(dfs)
+        self.assertEqual(big["open_time"].tolist(), [0, 60_000, 120_000])
+        self.assertEqual(big["close"].tolist(), [1.0, 2.0, 3.0])
+
+    def test_overlapping_chunks(self):
+        m = 60_000
+        dfs = [frame([0, m, 2 * m], [1.0, 2.0, 3.0]), frame([2 * m, 3 * m, 4 * m], [30.0, 4.0, 5.0])]
+        big = concat_dedup_sort(dfs)
+        self.assertEqual(big["open_time"].tolist(), [0, m, 2 * m, 3 * m, 4 * m])
+        # duplicate open_time: the row that comes first in chunk order is kept
+        self.assertEqual(big["close"].tolist(), [1.0, 2.0, 3.0, 4.0, 5.0])
+        pd.testing.assert_frame_equal(big, old_pipeline(dfs))
+
+    def test_duplicates_and_unsorted_chunks_match_old_pipeline(self):
+        m = 60_000
+        dfs = [
+            frame([5 * m, 6 * m, 5 * m], [1.0, 2.0, 3.0]),  # duplicate inside a chunk
+            frame([0, 6 * m, m], [4.0, 5.0, 6.0]),
+            frame([m, 2 * m], [7.0, 8.0]),
+        ]
+        big = concat_dedup_sort(dfs)
+        self.assertEqual(big["open_time"].tolist(), [0, m, 2 * m, 5 * m, 6 * m])
+        self.assertEqual(big["close"].tolist(), [4.0, 6.0, 8.0, 1.0, 2.0])
+        pd.testing.assert_frame_equal(big, old_pipeline(dfs))
+
+    def test_random_chunks_match_old_pipeline(self):
+        rng = np.random.default_rng(5)
+        for _ in range(50):
+            dfs = []
+            for _ in range(int(rng.integers(1, 5))):
+                ot = rng.integers(0, 40, int(rng.integers(1, 15))) * 60_000
+                if rng.random() < 0.5:
+                    ot = np.sort(ot)
+                dfs.append(frame(ot, rng.random(ot.size)))
+            pd.testing.assert_frame_equal(concat_dedup_sort(dfs), old_pipeline(dfs))
+
+
+class MergeAllTests(unittest.TestCase):
+    PREFIX = "btcusdt_spot_1m_"
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)  # existing_chunks/write_chunk use data/raw relative to cwd
+        os.makedirs(os.path.join("data", "raw"))
+        self.out = os.path.join(self.tmp.name, "merged.csv")
+        m = 60_000
+        # old run with open_time_iso, overlapping newer run without it
+        write_chunk(frame([0, m, 2 * m], [1.0, 2.0, 3.0], emit_iso=True), self.PREFIX, "csv")
+        write_chunk(frame([2 * m, 3 * m], [30.0, 4.0]), self.PREFIX, "csv")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_merge_without_iso(self):
+        merge_all(self.PREFIX, self.out, emit_iso=False)
+        big = pd.read_csv(self.out)
+        self.assertNotIn("open_time_iso", big.columns)
+        self.assertEqual(big["open_time"].tolist(), [0, 60_000, 120_000, 180_000])
+        self.assertEqual(big["close"].tolist(), [1.0, 2.0, 3.0, 4.0])
+
+    def test_merge_with_iso_fills_missing(self):
+        merge_all(self.PREFIX, self.out, emit_iso=True)
+        big = pd.read_csv(self.out)
+        self.assertEqual(list(big.columns[:2]), ["open_time", "open_time_iso"])
+        self.assertEqual(big["open_time_iso"].tolist(), [
+            "1970-01-01T00:00:00Z", "1970-01-01T00:01:00Z", "1970-01-01T00:02:00Z", "1970-01-01T00:03:00Z",
+        ])
+        self.assertEqual(big["close"].tolist(), [1.0, 2.0, 3.0, 4.0])
+
+    def test_fresh_chunks_are_not_reread(self):
+        m = 60_000
+        path = write_chunk(frame([4 * m], [5.0]), self.PREFIX, "csv")
+        fresh = {path: frame([4 * m], [50.0])}  # in-memory copy wins over the file
+        merge_all(self.PREFIX, self.out, fresh=fresh)
+        self.assertEqual(pd.read_csv(self.out)["close"].tolist(), [1.0, 2.0, 3.0, 4.0, 50.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
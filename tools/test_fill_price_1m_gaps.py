@@ -0,0 +1,118 @@
+# tools/test_fill_price_1m_gaps.py
+#
+# Unit tests for the gap helpers in fill_price_1m_gaps.py (no network, no data/ files).
+# ASCII-only.
+
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from tools.fill_price_1m_gaps import dedup_sort_open_time, find_gaps, missing_minutes
+
+M = 60_000  # one minute in ms
+
+
+def old_find_gaps(ts_seconds):
+    # loop version before the vectorized rewrite
+    diffs = ts_seconds[1:] - ts_seconds[:-1]
+    return [(int(ts_seconds[i]), int(ts_seconds[i + 1]), int((ts_seconds[i + 1] - ts_seconds[i]) // 60))
+            for i in np.where(diffs != 60)[0]]
+
+
+def old_missing_minutes(open_time_ms):
+    # setdiff1d over the full minute range, as pad_gaps did before
+    ot = np.asarray(open_time_ms, dtype=np.int64)
+    return np.setdiff1d(np.arange(ot[0], ot[-1] + 1, M, dtype=np.int64), ot)
+
+
+def as_tuples(gaps):
+    return list(zip(*(a.tolist() for a in gaps)))
+
+
+class FindGapsTests(unittest.TestCase):
+    def test_no_gaps(self):
+        prev_s, curr_s, gap_min = find_gaps(np.arange(0, 600, 60))
+        self.assertEqual((prev_s.size, curr_s.size, gap_min.size), (0, 0, 0))
+        self.assertEqual(gap_min.dtype, np.int64)
+
+    def test_one_gap(self):
+        ts = np.array([0, 60, 120, 420, 480])
+        self.assertEqual(as_tuples(find_gaps(ts)), [(120, 420, 5)])
+
+    def test_gap_at_start_and_end(self):
+        ts = np.array([0, 300, 360, 420, 900])
+        self.assertEqual(as_tuples(find_gaps(ts)), [(0, 300, 5), (420, 900, 8)])
+
+    def test_duplicate_timestamps(self):
+        # a repeated timestamp is a step != 60s as well (gap_min 0), as before
+        ts = np.array([0, 60, 60, 120])
+        self.assertEqual(as_tuples(find_gaps(ts)), [(60, 60, 0)])
+
+    def test_matches_old_loop(self):
+        rng = np.random.default_rng(1)
+        for _ in range(100):
+            ts = np.cumsum(rng.choice([0, 60, 60, 60, 120, 600], size=int(rng.integers(2, 60))))
+            self.assertEqual(as_tuples(find_gaps(ts)), old_find_gaps(ts))
+
+    def test_short_input(self):
+        for ts in (np.array([], dtype=np.int64), np.array([60])):
+            self.assertEqual(as_tuples(find_gaps(ts)), [])
+
+
+class MissingMinutesTests(unittest.TestCase):
+    def test_no_gaps(self):
+        self.assertEqual(missing_minutes(np.arange(0, 10 * M, M)).tolist(), [])
+
+    def test_one_gap(self):
+        self.assertEqual(missing_minutes([0, M, 5 * M, 6 * M]).tolist(), [2 * M, 3 * M, 4 * M])
+
+    def test_gap_at_start_and_end(self):
+        ot = [0, 3 * M, 4 * M, 7 * M]
+        self.assertEqual(missing_minutes(ot).tolist(), [M, 2 * M, 5 * M, 6 * M])
+
+    def test_duplicate_timestamps(self):
+        ot = [0, M, M, 3 * M, 3 * M, 4 * M]
+        self.assertEqual(missing_minutes(ot).tolist(), [2 * M])
+
+    def test_single_row(self):
+        self.assertEqual(missing_minutes([5 * M]).tolist(), [])
+
+    def test_matches_setdiff(self):
+        rng = np.random.default_rng(2)
+        for _ in range(100):
+            ot = np.cumsum(rng.choice([0, 1, 1, 1, 2, 7], size=int(rng.integers(1, 80)))) * M
+            np.testing.assert_array_equal(missing_minutes(ot), old_missing_minutes(ot))
+
+
+class DedupSortOpenTimeTests(unittest.TestCase):
+    def old_dedup_sort(self, big):
+        return big.drop_duplicates(subset=["open_time"], keep="first").sort_values("open_time").reset_index(drop=True)
+
+    def test_duplicates_keep_first(self):
+        big = pd.DataFrame({"open_time": [2 * M, 0, M, 0, 2 * M], "close": [1.0, 2.0, 3.0, 4.0, 5.0]})
+        out = dedup_sort_open_time(big)
+        self.assertEqual(out["open_time"].tolist(), [0, M, 2 * M])
+        self.assertEqual(out["close"].tolist(), [2.0, 3.0, 1.0])
+        pd.testing.assert_frame_equal(out, self.old_dedup_sort(big))
+
+    def test_no_duplicates_sorted(self):
+        big = pd.DataFrame({"open_time": [0, M, 2 * M], "close": [1.0, 2.0, 3.0]})
+        pd.testing.assert_frame_equal(dedup_sort_open_time(big), big)
+
+    def test_matches_old_pipeline(self):
+        rng = np.random.default_rng(3)
+        for _ in range(50):
+            n = int(rng.integers(1, 40))
+            big = pd.DataFrame({"open_time": rng.integers(0, 20, n) * M, "close": rng.random(n)})
+            pd.testing.assert_frame_equal(dedup_sort_open_time(big), self.old_dedup_sort(big))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+# tools/test_gs_input_preflight.py
+#
+# Tests for the importable preflight (run_preflight) and its in-process use in
+# gs_run_with_manifest.py: a failing preflight must stop the runner with rc=1.
+# ASCII-only.
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from tools import gs_input_preflight as preflight
+from tools import gs_run_with_manifest as runner
+
+
+def make_price_df(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "timestamp_utc": pd.date_range("2024-01-01", periods=n, freq="min").strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "close": 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.002, n))),
+        "rsi_signal": rng.integers(-1, 2, n),
+        "macd_signal": rng.integers(-1, 2, n),
+        "allow_long": 1,
+        "allow_short": 1,
+    })
+
+
+class RunPreflightTests(unittest.TestCase):
+    def run_quiet(self, df, **kw):
+        with contextlib.redirect_stdout(io.StringIO()):
+            preflight.run_preflight(df, "mem.csv", **kw)
+
+    def test_pass(self):
+        self.run_quiet(make_price_df(), require_signals="rsi,macd", timestamp_col="timestamp_utc")
+
+    def test_failures_raise_preflight_error(self):
+        bad_domain = make_price_df()
+        bad_domain.loc[10, "rsi_signal"] = 2
+        all_zero = make_price_df()
+        all_zero["macd_signal"] = 0
+        cases = [
+            (bad_domain, {"require_signals": "rsi"}),
+            (all_zero, {"require_signals": "macd", "fail_on_all_zero_signals": True}),
+            (make_price_df(), {"require_signals": "stoch"}),
+            (make_price_df(), {"regime_cols": "regime_v1"}),
+            (make_price_df(), {"offset": 10_000}),
+            (make_price_df().iloc[::-1], {"timestamp_col": "timestamp_utc"}),
+        ]
+        for df, kw in cases:
+            with self.assertRaises(preflight.PreflightError, msg=str(kw)):
+                self.run_quiet(df, **kw)
+
+
+class RunnerPreflightTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.outdir = Path(self.tmp.name) / "meta"
+        self.outdir.mkdir()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_runner(self, df):
+        csv = os.path.join(self.tmp.name, "price.csv")
+        df.to_csv(csv, index=False)
+        argv = ["gs_run_with_manifest.py", "--price-csv", csv, "--direction", "long",
+                "--comb-json", "{'rsi': 1.0, 'macd': 0.6}", "--preflight-rows", "500"]
+        out, err = io.StringIO(), io.StringIO()
+        with mock.patch.object(sys, "argv", argv), \
+                mock.patch.object(runner, "ensure_outdir", return_value=self.outdir), \
+                contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            try:
+                rc = runner.main()
+            except SystemExit as e:
+                rc = e.code
+        return rc, out.getvalue(), err.getvalue()
+
+    def test_failing_preflight_stops_runner(self):
+        df = make_price_df()
+        df.loc[3, "macd_signal"] = 5
+        rc, _, err = self.run_runner(df)
+        self.assertEqual(rc, 1)
+        self.assertIn("[FAIL] macd_signal", err)
+        self.assertIn("preflight failed rc=1", err)
+        # manifest is written before the preflight, but no evaluation
+        self.assertEqual(len(list(self.outdir.glob("run_manifest_*.json"))), 1)
+        self.assertEqual(list(self.outdir.glob("gs_eval_*.json")), [])
+
+    def test_passing_preflight_writes_eval(self):
+        rc, out, _ = self.run_runner(make_price_df())
+        self.assertEqual(rc, 0)
+        self.assertIn("[ok] GS INPUT PREFLIGHT: ALL PASS", out)
+        self.assertEqual(len(list(self.outdir.glob("gs_eval_*.json"))), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
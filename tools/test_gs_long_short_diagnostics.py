@@ -0,0 +1,288 @@
+# tools/test_gs_long_short_diagnostics.py
+#
+# Unit tests for gs_long_short_diagnostics.py helpers (no CSV on disk needed).
+# ASCII-only.
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from tools import gs_long_short_diagnostics as diag
+
+
+class LoadCombsTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "combs.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def load(self, text):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return diag._load_combs(self.path)
+
+    def test_dicts_and_strings(self):
+        combs = self.load(json.dumps([{"rsi": 1, "macd": 0.5}, "{'ma200': 0.4}"]))
+        self.assertEqual(combs, [{"rsi": 1.0, "macd": 0.5}, {"ma200": 0.4}])
+
+    def test_malformed_json_fails(self):
+        with self.assertRaises(SystemExit) as cm:
+            self.load('{"rsi": 1}\n{"macd": 1}\n')  # JSON lines, not a list
+        self.assertIn("COMBS is not valid JSON", str(cm.exception))
+
+    def test_empty_items_fail_with_index(self):
+        for items in ([{"rsi": 1}, ""], [{"rsi": 1}, "  "], [{}]):
+            with self.assertRaises(SystemExit) as cm:
+                self.load(json.dumps(items))
+            self.assertIn(f"COMBS item {len(items)}: empty comb", str(cm.exception))
+
+    def test_malformed_item_fails_with_index(self):
+        with self.assertRaises(SystemExit) as cm:
+            self.load(json.dumps([{"rsi": 1}, "{rsi: 1"]))
+        self.assertIn("COMBS item 2: cannot parse", str(cm.exception))
+
+    def test_non_list_fails(self):
+        with self.assertRaises(SystemExit):
+            self.load(json.dumps({"rsi": 1}))
+
+
+def reference_diag(score, close, direction, tp, sl, max_hold, enter_z, exit_z):
+    # bar-by-bar loop of the original _simulate_diag (before the kernel rewrite)
+    n = close.size
+    in_pos = False
+    entry_i = -1
+    entry_px = 0.0
+    rets, holds, codes = [], [], []
+    i = 0
+    while i < n:
+        if not in_pos:
+            if (direction == "long" and score[i] > enter_z) or (direction == "short" and score[i] < -enter_z):
+                in_pos = True
+                entry_i = i
+                entry_px = close[i]
+            i += 1
+            continue
+        j = i
+        hold = j - entry_i
+        if direction == "long":
+            r = (close[j] / entry_px) - 1.0
+            hit_score = score[j] < exit_z
+        else:
+            r = (entry_px / close[j]) - 1.0
+            hit_score = score[j] > -exit_z
+        code = -1
+        if r >= tp:
+            code = 0
+        elif r <= -sl:
+            code = 1
+        elif hit_score:
+            code = 2
+        elif hold >= max_hold:
+            code = 3
+        if code >= 0:
+            rets.append(r)
+            holds.append(hold if hold >= 1 else 1)
+            codes.append(code)
+            in_pos = False
+        i = j + 1
+    return np.array(rets, dtype=float), np.array(holds, dtype=np.int64), np.array(codes, dtype=np.int8)
+
+
+def random_case(rng, n):
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.004, n)))
+    sig = rng.integers(-1, 2, size=(n, 3)).astype(float)
+    score = sig @ np.array([1.0, 0.7, 0.4])
+    return score, close
+
+
+class SimKernelParityTests(unittest.TestCase):
+    # _sim_diag (njit when numba is installed), the plain-Python kernel and the
+    # NumPy fallback must all reproduce the original loop bit for bit
+    PATHS = (
+        ("dispatch", diag._sim_diag),
+        ("kernel", diag._sim_diag_kernel),
+        ("numpy", diag._sim_diag_numpy),
+    )
+
+    def check(self, score, close, direction, tp, sl, max_hold, enter_z, exit_z, seen):
+        ref = reference_diag(score, close, direction, tp, sl, max_hold, enter_z, exit_z)
+        entry_idx = diag._diag_entries(score, direction, enter_z)
+        for name, fn in self.PATHS:
+            rets, holds, codes, num = fn(score, close, entry_idx, direction == "long", tp, sl, max_hold, exit_z)
+            ctx = f"{name} {direction} tp={tp} sl={sl} max_hold={max_hold} enter_z={enter_z} exit_z={exit_z}"
+            self.assertEqual(num, ref[0].size, ctx)
+            self.assertTrue(np.array_equal(rets[:num], ref[0]), ctx)
+            self.assertTrue(np.array_equal(holds[:num], ref[1]), ctx)
+            self.assertTrue(np.array_equal(codes[:num], ref[2]), ctx)
+        seen.update(ref[2].tolist())
+
+    def test_random_inputs_match_reference(self):
+        rng = np.random.default_rng(20240611)
+        seen = set()
+        for _ in range(60):
+            score, close = random_case(rng, int(rng.integers(50, 600)))
+            for direction in ("long", "short"):
+                self.check(
+                    score,
+                    close,
+                    direction,
+                    tp=float(rng.choice([0.002, 0.01, 0.04])),
+                    sl=float(rng.choice([0.002, 0.01, 0.02])),
+                    max_hold=int(rng.choice([1, 5, 30, 1440])),
+                    enter_z=float(rng.choice([0.5, 1.0, 1.5])),
+                    exit_z=float(rng.choice([-2.5, 0.0, 0.5])),
+                    seen=seen,
+                )
+        # every exit reason (TP, SL, SCORE, MAXHOLD) was exercised
+        self.assertEqual(seen, {0, 1, 2, 3})
+
+    def test_long_holds_cross_fallback_blocks(self):
+        # exit_z far away: only TP/SL/MAXHOLD end a trade, holds span several
+        # of the fallback's vectorized blocks; open trades at the end are dropped
+        rng = np.random.default_rng(7)
+        seen = set()
+        score, close = random_case(rng, 5000)
+        for direction in ("long", "short"):
+            for max_hold in (100, 700, 100000):
+                self.check(score, close, direction, 0.06, 0.06, max_hold, 1.0, -10.0 if direction == "long" else 10.0, seen)
+        self.assertTrue({0, 1, 3} <= seen)
+
+    def test_no_entries(self):
+        score = np.zeros(50)
+        close = np.linspace(100.0, 101.0, 50)
+        self.check(score, close, "long", 0.04, 0.02, 1440, 1.0, 0.0, set())
+
+    def test_simulate_diag_frame_matches_reference(self):
+        rng = np.random.default_rng(3)
+        n = 800
+        close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.004, n)))
+        df = pd.DataFrame({"close": close})
+        comb = {"rsi": 1.0, "macd": 0.7, "ma200": 0.4}
+        for k in comb:
+            df[f"{k}_signal"] = rng.integers(-1, 2, n)
+        score = sum(w * df[f"{k}_signal"].to_numpy(dtype=float) for k, w in comb.items())
+        for direction in ("long", "short"):
+            dr = diag._simulate_diag(df, comb, direction, 0.01, 0.005, 30, 0.5, 0.2)
+            rets, holds, codes = reference_diag(score, close, direction, 0.01, 0.005, 30, 0.5, 0.2)
+            self.assertTrue(np.array_equal(dr.returns, rets))
+            self.assertTrue(np.array_equal(dr.hold_bars, holds))
+            self.assertEqual(dr.roi, float(np.sum(rets)))
+            self.assertEqual([dr.exit_counts[k] for k in diag.EXIT_REASONS], np.bincount(codes, minlength=4).tolist())
+
+
+class GridTests(unittest.TestCase):
+    # weights 0.1/0.2 never reach the GS default enter_z=1.0, so BASE and
+    # DIAG_DEFAULT agree (no trades) and the grid (enter_z < 0.3) has trades
+    COMB = {"rsi": 0.1, "macd": 0.2}
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(11)
+        n = 3000
+        self.df = pd.DataFrame({
+            "close": 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.004, n))),
+            "rsi_signal": rng.integers(-1, 2, n).astype(float),
+            "macd_signal": rng.integers(-1, 2, n),
+        })
+        self.csv = os.path.join(self.tmp.name, "in.csv")
+        self.df.to_csv(self.csv, index=False)
+        self.params = diag._get_gs_defaults()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_main(self, *argv):
+        out = io.StringIO()
+        with mock.patch.object(sys, "argv", ["gs_long_short_diagnostics.py", *argv]), contextlib.redirect_stdout(out):
+            rc = diag.main()
+        return rc, out.getvalue()
+
+    def test_load_grid_product_and_defaults(self):
+        grid = diag._load_grid('{"tp": [0.01, 0.02], "enter_z": [0.5, 1.0, 1.5]}', self.params)
+        self.assertEqual(len(grid), 6)
+        self.assertEqual([(g["tp"], g["enter_z"]) for g in grid[:3]], [(0.01, 0.5), (0.01, 1.0), (0.01, 1.5)])
+        for g in grid:
+            self.assertEqual((g["sl"], g["max_hold"], g["exit_z"]), (self.params["sl"], self.params["max_hold"], self.params["exit_z"]))
+            self.assertIsInstance(g["max_hold"], int)
+
+    def test_load_grid_from_file(self):
+        path = os.path.join(self.tmp.name, "grid.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"max_hold": [30, 60.0]}, f)
+        self.assertEqual([g["max_hold"] for g in diag._load_grid(path, self.params)], [30, 60])
+
+    def test_load_grid_rejects_bad_specs(self):
+        cases = {
+            "{not json": "not valid JSON",
+            "[0.01]": "non-empty JSON object",
+            "{}": "non-empty JSON object",
+            '{"take_profit": [0.01]}': "unknown keys",
+            '{"tp": []}': "empty value list for tp",
+            '{"tp": ["x"]}': "tp values must be numbers",
+            '{"sl": [true]}': "sl values must be numbers",
+            '{"max_hold": [10.7]}': "max_hold values must be integers",
+        }
+        for spec, msg in cases.items():
+            with self.assertRaises(SystemExit, msg=spec) as cm:
+                diag._load_grid(spec, self.params)
+            self.assertIn(msg, str(cm.exception), spec)
+
+    def test_grid_rows_match_direct_diag_run(self):
+        out_csv = os.path.join(self.tmp.name, "out", "grid.csv")
+        spec = {"tp": [0.005, 0.02], "sl": [0.004], "max_hold": [5, 60], "enter_z": [0.15, 0.25], "exit_z": [0.0]}
+        for direction in ("long", "short"):
+            rc, _ = self.run_main("--csv", self.csv, "--rows", "3000", "--direction", direction,
+                                  "--comb", json.dumps(self.COMB), "--fee", "0.001",
+                                  "--grid", json.dumps(spec), "--out_csv", out_csv)
+            self.assertEqual(rc, 0)
+            got = pd.read_csv(out_csv, float_precision="round_trip")
+            self.assertEqual(len(got), 8)
+
+            # reference on the same window the tool loaded (CSV parse, not self.df)
+            df = diag._load_csv_window(self.csv, 3000)
+            score = diag._diag_score(df, self.COMB)
+            close = df["close"].to_numpy(dtype=float)
+            for row in got.itertuples(index=False):
+                entries = diag._diag_entries(score, direction, row.enter_z)
+                dr = diag._diag_run(score, close, entries, direction, row.tp, row.sl, int(row.max_hold), row.exit_z)
+                self.assertGreater(dr.num_trades, 0)
+                self.assertEqual(row.direction, direction)
+                self.assertEqual(json.loads(row.comb), self.COMB)
+                self.assertEqual(row.num_trades, dr.num_trades)
+                self.assertEqual(row.roi, dr.roi)
+                self.assertEqual(row.roi_fee, dr.roi - 0.001 * dr.num_trades)
+                self.assertEqual(row.sharpe, dr.sharpe)
+                self.assertEqual(row.winrate, dr.winrate)
+                for k in diag.EXIT_REASONS:
+                    self.assertEqual(getattr(row, f"exit_{k}"), dr.exit_counts[k])
+
+    def test_grid_requires_out_csv(self):
+        with self.assertRaises(SystemExit):
+            self.run_main("--csv", self.csv, "--direction", "long", "--grid", '{"tp": [0.01]}')
+
+    def test_sanity_mismatch_skips_comb(self):
+        rows = []
+        fake_base = {"roi": 1.0, "num_trades": 1}
+        with mock.patch.object(diag, "evaluate_strategy", return_value=fake_base), contextlib.redirect_stdout(io.StringIO()):
+            rc = diag._run_grid(self.df, self.COMB, "long", 0.0, self.params,
+                                diag._load_grid('{"enter_z": [0.15]}', self.params), rows)
+        self.assertEqual(rc, 2)
+        self.assertEqual(rows, [])
+
+
+if __name__ == "__main__":
+    unittest.main()